@@ -4,7 +4,7 @@ CaseScope 2026 - Audit Logging Utility
 Tracks user actions for security and compliance
 """
 
-from flask import request
+from flask import request, has_request_context
 from flask_login import current_user
 from datetime import datetime
 import json
@@ -30,13 +30,20 @@ def log_action(action, resource_type=None, resource_id=None, resource_name=None,
         from main import db
         from models import AuditLog
         
+        # Background tasks (Celery) have no request or logged-in user
+        in_request = has_request_context()
+        
         # Get user info
-        user_id = current_user.id if current_user.is_authenticated else None
-        username = current_user.username if current_user.is_authenticated else 'anonymous'
+        if in_request and current_user.is_authenticated:
+            user_id = current_user.id
+            username = current_user.username
+        else:
+            user_id = None
+            username = 'anonymous' if in_request else 'system'
         
         # Get request info - check for proxy headers first
         ip_address = None
-        if request:
+        if in_request:
             # Check X-Forwarded-For header (most common proxy header)
             # Format: "client_ip, proxy1_ip, proxy2_ip"
             forwarded_for = request.headers.get('X-Forwarded-For', '')
@@ -49,4 +49,7 @@ class Config:
     
     # Event Deduplication
     DEDUPLICATE_EVENTS = True  # Enable event-level deduplication globally
+    
+    # Search Blob (flattened EventData/message text used by IOC phrase hunting)
+    BUILD_SEARCH_BLOB = True  # Disable only on deployments that never hunt IOCs
 
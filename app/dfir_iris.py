@@ -2,9 +2,22 @@
 import requests
 import logging
 import json
+import io
+import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
 import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # Optional speedup - fall back to stdlib json
+    orjson = None
 
 # Disable SSL warnings for self-signed certificates
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -12,6 +25,117 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)  # Enable debug logging for this module
 
+# Max concurrent in-flight DFIR-IRIS requests during case sync (also the session pool size)
+IRIS_SYNC_CONCURRENCY = 8
+
+# Max document IDs per OpenSearch mget when loading tagged events
+MGET_BATCH_SIZE = 500
+
+# CaseScope IOC type -> DFIR-IRIS IOC type ID
+IOC_TYPE_OTHER = 96
+IOC_TYPE_MAP = {
+    'ip': 76,           # ip-any
+    'hostname': 69,     # hostname
+    'domain': 20,       # domain
+    'url': 141,         # url
+    'username': 133,    # target-user
+    'email': 22,        # email
+    'hash': 90,         # md5 (generic hash fallback)
+    'md5': 90,          # md5
+    'sha1': 111,        # sha1
+    'sha256': 113,      # sha256
+    'command': IOC_TYPE_OTHER,  # other
+    'filename': 37,     # filename
+    'port': 106,        # port
+    'registry': 109,    # regkey
+    'malware': 89       # malware-type
+}
+
+# ISO-8601 timestamp: captures date, time and optional fraction, discards Z / +HH:MM / -HH:MM
+_TIMESTAMP_RE = re.compile(
+    r'^(?P<d>\d{4}-\d{2}-\d{2})T(?P<t>\d{2}:\d{2}:\d{2})(?:\.(?P<f>\d+))?(?:Z|[+-]\d{2}:?\d{2})?$'
+)
+
+
+def _json_loads(content: bytes) -> Any:
+    """Parse a JSON response body (orjson when available)"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _json_dumps_pretty(obj: Any) -> str:
+    """Serialize to indented, key-sorted JSON (orjson when available)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS, default=str).decode('utf-8')
+        except TypeError:
+            pass  # e.g. non-string keys or out-of-range ints - use stdlib below
+    return json.dumps(obj, indent=2, sort_keys=True, default=str)
+
+
+class _MultipartFileStream:
+    """Streaming multipart/form-data body for a single file upload
+    
+    Form fields and part headers are encoded up front; the file itself is
+    read from disk in chunks as the request is sent, so memory stays flat
+    regardless of file size. Length is known, so requests sends Content-Length.
+    """
+    
+    CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, fields: Dict[str, str], file_field: str, filename: str, file_path: str,
+                 file_content_type: str = 'application/octet-stream'):
+        boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+        
+        safe_filename = filename.replace('\\', '\\\\').replace('"', '\\"')
+        head = b''.join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+            for name, value in fields.items()
+        )
+        head += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{safe_filename}"\r\n'
+            f'Content-Type: {file_content_type}\r\n\r\n'
+        ).encode('utf-8')
+        tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        
+        self._file = open(file_path, 'rb')
+        self._parts = [io.BytesIO(head), self._file, io.BytesIO(tail)]
+        self._length = len(head) + os.fstat(self._file.fileno()).st_size + len(tail)
+    
+    def __len__(self):
+        return self._length
+    
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b''.join(part.read() for part in self._parts)
+        chunks = []
+        while size > 0 and self._parts:
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+    
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    
+    def close(self):
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
 
 class DFIRIrisClient:
     """Client for DFIR-IRIS API"""
@@ -23,25 +147,90 @@ class DFIRIrisClient:
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
         }
+        
+        # Pooled session so keep-alive connections are reused across API calls
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # List endpoints return large JSON arrays - ask for compression explicitly
+        # (nginx in front of DFIR-IRIS needs 'gzip on; gzip_types application/json;' to honour it)
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+        self._encoding_logged = False
+        self.session.verify = False  # Disable SSL verification for self-signed certs
+        # Pool sized to the sync concurrency; pool_block makes extra callers wait for a
+        # pooled connection instead of opening throwaway ones (no HTTP/2 multiplexing in urllib3)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=IRIS_SYNC_CONCURRENCY,
+            pool_block=True,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Conditional GET cache for list endpoints: {endpoint: (etag, parsed_body)}
+        self._etag_cache: Dict[str, Tuple[str, Any]] = {}
+        
+        # Name indexes over the customer/case lists, rebuilt when a fresh list is fetched
+        # (list_body, index) - the body identity tells us whether an ETag hit reused it
+        self._customers_index: Tuple[Any, Dict[str, int]] = (None, {})  # {customer_name_lower: customer_id}
+        self._cases_index: Tuple[Any, Dict[str, List[Tuple[str, str, int]]]] = (None, {})  # {client_lower: [(case_lower, case_name, case_id)]}
+        
+        # Per-client lookup caches (client lifetime is one sync/request)
+        self._asset_type_id: Optional[int] = None  # Resolved 'Windows - Computer' asset type
+        self._case_assets_cache: Dict[int, Dict[str, int]] = {}  # {case_id: {HOSTNAME: asset_id}}
+    
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
     
-    def _request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Optional[Dict]:
-        """Make API request"""
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _request(self, method: str, endpoint: str, data: Optional[Dict] = None, use_etag: bool = False) -> Optional[Dict]:
+        """Make API request
+        
+        use_etag: for GETs, send If-None-Match with the last ETag seen for this
+        endpoint and return the cached body on 304 Not Modified
+        """
         try:
             # DFIR-IRIS API v2 uses /api/v2/ prefix
             if not endpoint.startswith('/'):
                 endpoint = '/' + endpoint
             url = f"{self.url}{endpoint}"
             
-            response = requests.request(
+            use_etag = use_etag and method == 'GET'
+            cached = self._etag_cache.get(endpoint) if use_etag else None
+            
+            response = self.session.request(
                 method=method,
                 url=url,
-                headers=self.headers,
                 json=data,
-                timeout=30,
-                verify=False  # Disable SSL verification for self-signed certs
+                headers={'If-None-Match': cached[0]} if cached else None,
+                timeout=30
             )
+            if not self._encoding_logged and method == 'GET':
+                self._encoding_logged = True
+                logger.debug("[DFIR-IRIS] Response Content-Encoding: %s",
+                             response.headers.get('Content-Encoding', 'identity (uncompressed)'))
+            if cached and response.status_code == 304:
+                return cached[1]
             response.raise_for_status()
-            return response.json() if response.text else {}
+            try:
+                result = _json_loads(response.content) if response.content else {}
+            except ValueError as e:
+                # 2xx with a non-JSON body (login/proxy HTML page, truncated body):
+                # fail this call only, as response.json()'s RequestException did
+                logger.error(f"[DFIR-IRIS] API request failed: invalid JSON response ({e}) | Response: {response.text[:500]}")
+                logger.error(f"[DFIR-IRIS] Request: {method} {url} | Data: {data}")
+                return None
+            
+            etag = response.headers.get('ETag') if use_etag else None
+            if etag:
+                self._etag_cache[endpoint] = (etag, result)
+            return result
         except requests.exceptions.RequestException as e:
             # Log detailed error including response body if available
             error_detail = str(e)
@@ -57,15 +246,23 @@ class DFIRIrisClient:
     def get_or_create_customer(self, company_name: str) -> Optional[int]:
         """Get or create customer (company) in DFIR-IRIS"""
         # List customers
-        result = self._request('GET', '/manage/customers/list')
+        result = self._request('GET', '/manage/customers/list', use_etag=True)
         if not result or 'data' not in result:
             return None
         
+        # Index customers by lowercase name (only when the list body changed)
+        if self._customers_index[0] is not result:
+            customers_by_lname = {}
+            for customer in result['data']:
+                customers_by_lname.setdefault(customer.get('customer_name', '').lower(), customer['customer_id'])
+            self._customers_index = (result, customers_by_lname)
+        customers_by_lname = self._customers_index[1]
+        
         # Check if customer exists
-        for customer in result['data']:
-            if customer.get('customer_name', '').lower() == company_name.lower():
-                logger.info(f"[DFIR-IRIS] Customer found: {company_name} (ID: {customer['customer_id']})")
-                return customer['customer_id']
+        customer_id = customers_by_lname.get(company_name.lower())
+        if customer_id is not None:
+            logger.info(f"[DFIR-IRIS] Customer found: {company_name} (ID: {customer_id})")
+            return customer_id
         
         # Create customer
         data = {'customer_name': company_name}
@@ -73,6 +270,7 @@ class DFIRIrisClient:
         if result and 'data' in result:
             customer_id = result['data'].get('customer_id')
             logger.info(f"[DFIR-IRIS] Customer created: {company_name} (ID: {customer_id})")
+            customers_by_lname[company_name.lower()] = customer_id
             return customer_id
         
         return None
@@ -80,32 +278,33 @@ class DFIRIrisClient:
     def get_or_create_case(self, customer_id: int, case_name: str, case_description: str = '', company_name: str = '') -> Optional[int]:
         """Get or create case in DFIR-IRIS"""
         # List cases
-        result = self._request('GET', '/manage/cases/list')
+        result = self._request('GET', '/manage/cases/list', use_etag=True)
         if not result or 'data' not in result:
             return None
         
-        # Check if case exists - DFIR-IRIS uses client_name (string) not customer_id (int)
+        # Index cases by lowercase client name (only when the list body changed)
+        # DFIR-IRIS stores company as 'client_name' (string), not customer_id
+        if self._cases_index[0] is not result:
+            cases_by_client = {}
+            for idx, case in enumerate(result['data']):
+                # Log the first case structure for debugging
+                if idx == 0:
+                    logger.info(f"[DFIR-IRIS] Sample case structure: {list(case.keys())}")
+                case_name_in_iris = case.get('case_name', '')
+                cases_by_client.setdefault(case.get('client_name', '').lower(), []).append(
+                    (case_name_in_iris.lower(), case_name_in_iris, case['case_id'])
+                )
+            self._cases_index = (result, cases_by_client)
+        cases_by_client = self._cases_index[1]
+        
+        # Check if case exists - only this client's cases need scanning
         logger.info(f"[DFIR-IRIS] Searching for case containing '{case_name}' with company '{company_name}'")
-        for idx, case in enumerate(result['data']):
-            # Log the first case structure for debugging
-            if idx == 0:
-                logger.info(f"[DFIR-IRIS] Sample case structure: {list(case.keys())}")
-            
-            # DFIR-IRIS stores company as 'client_name' (string), not customer_id
-            case_client_name = case.get('client_name', '').lower()
-            case_name_in_iris = case.get('case_name', '')
-            
+        our_case_name_lower = case_name.lower()
+        for case_name_lower, case_name_in_iris, iris_case_id in cases_by_client.get(company_name.lower(), []):
             # DFIR-IRIS adds prefix like "#12 - " to case names, so check if our case name is in theirs
-            case_name_lower = case_name_in_iris.lower()
-            our_case_name_lower = case_name.lower()
-            
-            logger.debug(f"[DFIR-IRIS] Comparing: case_name='{case_name_lower}' contains '{our_case_name_lower}'? client='{case_client_name}' vs '{company_name.lower()}'")
-            
-            # Match if our case name is contained in DFIR-IRIS case name AND client matches
-            if (our_case_name_lower in case_name_lower and 
-                case_client_name == company_name.lower()):
-                logger.info(f"[DFIR-IRIS] Case found: {case_name_in_iris} (ID: {case['case_id']})")
-                return case['case_id']
+            if our_case_name_lower in case_name_lower:
+                logger.info(f"[DFIR-IRIS] Case found: {case_name_in_iris} (ID: {iris_case_id})")
+                return iris_case_id
         
         logger.info(f"[DFIR-IRIS] No matching case found, will create new case")
         
@@ -125,6 +324,7 @@ class DFIRIrisClient:
         if result and 'data' in result:
             case_id = result['data'].get('case_id')
             logger.info(f"[DFIR-IRIS] Case created: {case_name} (ID: {case_id}, SOC ID: {soc_id})")
+            cases_by_client.setdefault(company_name.lower(), []).append((our_case_name_lower, case_name, case_id))
             
             # Grant current user full access to the case (fixes "No case found" error)
             try:
@@ -163,11 +363,19 @@ class DFIRIrisClient:
     
     def get_case_iocs(self, case_id: int) -> List[Dict]:
         """Get all IOCs for a case from DFIR-IRIS"""
-        result = self._request('GET', f'/case/ioc/list?cid={case_id}')
+        result = self._request('GET', f'/case/ioc/list?cid={case_id}', use_etag=True)
         if result and 'data' in result and 'ioc' in result['data']:
             return result['data']['ioc']
         return []
     
+    @staticmethod
+    def index_iocs_by_value(iocs: List[Dict]) -> Dict[str, Dict]:
+        """Index IRIS IOCs by value (first IOC wins for duplicate values)"""
+        iocs_by_value = {}
+        for ioc in iocs:
+            iocs_by_value.setdefault(ioc.get('ioc_value'), ioc)
+        return iocs_by_value
+    
     def get_asset_types(self) -> List[Dict]:
         """Get available asset types from DFIR-IRIS"""
         result = self._request('GET', '/manage/asset-type/list')
@@ -177,7 +385,7 @@ class DFIRIrisClient:
     
     def get_case_assets(self, case_id: int) -> List[Dict]:
         """Get all assets for a case from DFIR-IRIS"""
-        result = self._request('GET', f'/case/assets/list?cid={case_id}')
+        result = self._request('GET', f'/case/assets/list?cid={case_id}', use_etag=True)
         if result and 'data' in result:
             # DFIR-IRIS returns data.assets array
             if isinstance(result['data'], dict) and 'assets' in result['data']:
@@ -212,25 +420,42 @@ class DFIRIrisClient:
             return asset_id
         return None
     
-    def get_or_create_asset(self, case_id: int, hostname: str) -> Optional[int]:
-        """Get existing asset or create if doesn't exist (for Windows hostnames)"""
-        # Get existing assets
-        existing_assets = self.get_case_assets(case_id)
+    def get_asset_cache(self, case_id: int) -> Dict[str, int]:
+        """Get the asset cache for a case as {HOSTNAME: asset_id}
         
-        # Check if asset already exists (case-insensitive)
-        hostname_lower = hostname.lower()
-        for asset in existing_assets:
-            if asset.get('asset_name', '').lower() == hostname_lower:
-                logger.debug(f"[DFIR-IRIS] Asset exists: {hostname} (ID: {asset.get('asset_id')})")
-                return asset.get('asset_id')
+        Existing case assets are listed once; get_or_create_asset adds the ones
+        it creates, so the cache persists across syncs on this client.
+        """
+        asset_cache = self._case_assets_cache.get(case_id)
+        if asset_cache is None:
+            asset_cache = {}
+            try:
+                for asset in self.get_case_assets(case_id):
+                    asset_name = (asset.get('asset_name') or '').strip().upper()
+                    if asset_name and asset.get('asset_id'):
+                        asset_cache.setdefault(asset_name, asset['asset_id'])
+            except Exception as e:
+                logger.warning(f"[DFIR-IRIS] Failed to list case assets (retried on next use): {e}")
+                return asset_cache
+            self._case_assets_cache[case_id] = asset_cache
+        return asset_cache
+    
+    def invalidate_asset_cache(self, case_id: int):
+        """Drop cached asset IDs for a case (e.g. after failed pushes that may reference stale assets)"""
+        self._case_assets_cache.pop(case_id, None)
+    
+    def _get_windows_computer_type_id(self) -> int:
+        """Get the 'Windows - Computer' asset type ID (looked up once per client)"""
+        if self._asset_type_id is not None:
+            return self._asset_type_id
         
         # Get asset types and find "Windows - Computer"
         asset_types = self.get_asset_types()
         windows_computer_type_id = None
         
         for asset_type in asset_types:
-            type_name = asset_type.get('asset_name', '')
-            if 'windows' in type_name.lower() and 'computer' in type_name.lower():
+            type_name = asset_type.get('asset_name', '').lower()
+            if 'windows' in type_name and 'computer' in type_name:
                 windows_computer_type_id = asset_type.get('asset_id')
                 break
         
@@ -239,26 +464,51 @@ class DFIRIrisClient:
             # Fallback to first available type or ID 1
             windows_computer_type_id = asset_types[0].get('asset_id') if asset_types else 1
         
+        # Only cache a real lookup - an empty type list may be a transient API failure
+        if asset_types:
+            self._asset_type_id = windows_computer_type_id
+        return windows_computer_type_id
+    
+    def get_or_create_asset(self, case_id: int, hostname: str) -> Optional[int]:
+        """Get existing asset or create if doesn't exist (for Windows hostnames)"""
+        # Existing assets (listed once per case, then kept up to date in the cache)
+        asset_cache = self.get_asset_cache(case_id)
+        
+        # Check if asset already exists (case-insensitive)
+        asset_name = hostname.strip().upper()
+        if asset_name in asset_cache:
+            logger.debug("[DFIR-IRIS] Asset exists: %s (ID: %s)", hostname, asset_cache[asset_name])
+            return asset_cache[asset_name]
+        
         # Create asset
-        return self.create_asset(case_id, hostname, windows_computer_type_id)
+        asset_id = self.create_asset(case_id, hostname, self._get_windows_computer_type_id())
+        if asset_id:
+            asset_cache[asset_name] = asset_id
+        return asset_id
     
-    def sync_ioc(self, case_id: int, ioc_value: str, ioc_type: str, description: str = '', threat_level: str = 'medium') -> Optional[int]:
-        """Sync IOC to DFIR-IRIS (create or update)"""
+    def sync_ioc(self, case_id: int, ioc_value: str, ioc_type: str, description: str = '', threat_level: str = 'medium',
+                 existing_iocs_by_value: Dict[str, Dict] = None) -> Optional[int]:
+        """Sync IOC to DFIR-IRIS (create or update)
+        
+        existing_iocs_by_value: optional {ioc_value: ioc} map of the case IOCs,
+        avoids listing all IOCs per call (new IOCs are added to it)
+        """
         # Check if IOC already exists
-        existing_iocs = self.get_case_iocs(case_id)
-        for ioc in existing_iocs:
-            if ioc.get('ioc_value') == ioc_value:
-                # Update existing
-                update_data = {
-                    'ioc_description': description,
-                    'ioc_type_id': self._get_ioc_type_id(ioc_type),
-                    'ioc_tags': threat_level,
-                    'ioc_tlp_id': 2,
-                    'cid': case_id
-                }
-                self._request('POST', f'/case/ioc/update/{ioc["ioc_id"]}', update_data)
-                logger.info(f"[DFIR-IRIS] IOC updated: {ioc_value}")
-                return ioc['ioc_id']
+        if existing_iocs_by_value is None:
+            existing_iocs_by_value = self.index_iocs_by_value(self.get_case_iocs(case_id))
+        ioc = existing_iocs_by_value.get(ioc_value)
+        if ioc:
+            # Update existing
+            update_data = {
+                'ioc_description': description,
+                'ioc_type_id': self._get_ioc_type_id(ioc_type),
+                'ioc_tags': threat_level,
+                'ioc_tlp_id': 2,
+                'cid': case_id
+            }
+            self._request('POST', f'/case/ioc/update/{ioc["ioc_id"]}', update_data)
+            logger.info(f"[DFIR-IRIS] IOC updated: {ioc_value}")
+            return ioc['ioc_id']
         
         # Create new IOC - DFIR-IRIS requires specific fields
         data = {
@@ -273,33 +523,115 @@ class DFIRIrisClient:
         if result and 'data' in result:
             ioc_id = result['data'].get('ioc_id')
             logger.info(f"[DFIR-IRIS] IOC created: {ioc_value} (ID: {ioc_id})")
+            existing_iocs_by_value[ioc_value] = {'ioc_id': ioc_id, 'ioc_value': ioc_value}
             return ioc_id
         
         return None
     
     def _get_ioc_type_id(self, ioc_type: str) -> int:
         """Map CaseScope IOC types to DFIR-IRIS type IDs"""
-        type_map = {
-            'ip': 76,           # ip-any
-            'hostname': 69,     # hostname
-            'domain': 20,       # domain
-            'url': 141,         # url
-            'username': 133,    # target-user
-            'email': 22,        # email
-            'hash': 90,         # md5 (generic hash fallback)
-            'md5': 90,          # md5
-            'sha1': 111,        # sha1
-            'sha256': 113,      # sha256
-            'command': 96,      # other
-            'filename': 37,     # filename
-            'port': 106,        # port
-            'registry': 109,    # regkey
-            'malware': 89       # malware-type
-        }
-        return type_map.get(ioc_type.lower(), 96)  # Default to 'other' if unknown
+        type_id = IOC_TYPE_MAP.get(ioc_type)  # CaseScope types are normally already lowercase
+        if type_id is None:
+            type_id = IOC_TYPE_MAP.get(ioc_type.lower(), IOC_TYPE_OTHER)  # Default to 'other' if unknown
+        return type_id
+    
+    def get_casescope_timeline_events(self, case_id: int) -> Dict[str, int]:
+        """Get CaseScope-pushed timeline events for a case as {casescope_id: event_id}"""
+        events_by_csid = {}
+        result = self._request('GET', f'/case/timeline/events/list?cid={case_id}', use_etag=True)
+        if result and 'data' in result and 'timeline' in result['data']:
+            for event in result['data']['timeline']:
+                # CaseScope stores its unique ID in event_tags as 'casescope_id:<index>:<event_id>'
+                tag_value = (event.get('event_tags') or '').partition('casescope_id:')[2]
+                casescope_id = tag_value.split(',')[0].strip()
+                if casescope_id:
+                    events_by_csid[casescope_id] = event.get('event_id')
+        return events_by_csid
+    
+    def _resolve_event_asset(self, case_id: int, computer_name: str, asset_cache: Dict[str, int],
+                             create: bool = True) -> Optional[int]:
+        """Get asset ID for an event's computer name, creating the asset if needed (cached by hostname)
+        
+        create=False only reads the cache (hosts missing from it get no asset)
+        """
+        if not computer_name:
+            return None
+        
+        # Strip domain suffix and clean hostname
+        hostname = computer_name.split('.')[0] if '.' in computer_name else computer_name
+        hostname = hostname.strip().upper()  # Normalize to uppercase for cache matching
+        if not hostname:
+            return None
+        
+        try:
+            # Check cache first
+            if hostname in asset_cache:
+                logger.debug("[DFIR-IRIS] Using cached asset: %s (ID: %s)", hostname, asset_cache[hostname])
+                return asset_cache[hostname]
+            if not create:
+                return None
+            
+            # Not in cache - query/create
+            asset_id = self.get_or_create_asset(case_id, hostname)
+            if asset_id:
+                asset_cache[hostname] = asset_id  # Cache it
+            return asset_id
+        except Exception as e:
+            logger.warning(f"[DFIR-IRIS] Failed to create/link asset {hostname}: {e}")
+            return None
+    
+    def sync_timeline_events_bulk(self, case_id: int, events: List[Tuple[str, Dict]], asset_cache: Dict[str, int] = None,
+                                  existing_events_by_csid: Dict[str, int] = None) -> Dict[str, Optional[int]]:
+        """Sync many timeline events to DFIR-IRIS
+        
+        DFIR-IRIS has no bulk add endpoint, so events are added concurrently
+        (IRIS_SYNC_CONCURRENCY at a time). Assets are resolved serially first so
+        concurrent adds only read the asset cache and never create duplicates;
+        events for hosts whose asset could not be resolved are pushed unlinked.
+        
+        Args:
+            events: list of (casescope_event_id, event_data) tuples
+        
+        Returns:
+            Dict of {casescope_event_id: IRIS event ID or None on failure}
+        """
+        if asset_cache is None:
+            asset_cache = self.get_asset_cache(case_id)
+        if existing_events_by_csid is None:
+            existing_events_by_csid = self.get_casescope_timeline_events(case_id)
+        
+        # Warm the asset cache once per distinct computer name
+        failed_hosts = []
+        for computer_name in {event_data.get('computer_name', '') for _, event_data in events}:
+            if computer_name and not self._resolve_event_asset(case_id, computer_name, asset_cache):
+                failed_hosts.append(computer_name)
+        if failed_hosts:
+            logger.warning(f"[DFIR-IRIS] No asset for {len(failed_hosts)} host(s), their events are pushed without one: "
+                           f"{', '.join(sorted(failed_hosts)[:10])}")
+        
+        def sync_one(item):
+            casescope_event_id, event_data = item
+            try:
+                return casescope_event_id, self.sync_timeline_event(
+                    case_id, event_data, casescope_event_id, asset_cache, existing_events_by_csid,
+                    create_assets=False
+                )
+            except Exception as e:
+                logger.error(f"[DFIR-IRIS] Failed to sync event {casescope_event_id}: {e}")
+                return casescope_event_id, None
+        
+        with ThreadPoolExecutor(max_workers=IRIS_SYNC_CONCURRENCY) as executor:
+            return dict(executor.map(sync_one, events))
     
-    def sync_timeline_event(self, case_id: int, event_data: Dict, casescope_event_id: str, asset_cache: Dict[str, int] = None) -> Optional[int]:
-        """Sync timeline event to DFIR-IRIS"""
+    def sync_timeline_event(self, case_id: int, event_data: Dict, casescope_event_id: str, asset_cache: Dict[str, int] = None,
+                            existing_events_by_csid: Dict[str, int] = None, create_assets: bool = True) -> Optional[int]:
+        """Sync timeline event to DFIR-IRIS
+        
+        existing_events_by_csid: optional {casescope_id: event_id} map from
+        get_casescope_timeline_events, avoids listing the timeline per event
+        create_assets: False to only link assets already in asset_cache
+        (sync_timeline_events_bulk creates them serially beforehand)
+        """
         timestamp = event_data.get('timestamp')
         title = event_data.get('title')
         description = event_data.get('description', '')
@@ -307,26 +639,30 @@ class DFIRIrisClient:
         raw_data = event_data.get('raw_data', {})
         ioc_ids = event_data.get('ioc_ids', [])
         
-        # Initialize cache if not provided
+        # Use the client's case asset cache if none was provided
         if asset_cache is None:
-            asset_cache = {}
+            asset_cache = self.get_asset_cache(case_id)
         
         # Format timestamp for DFIR-IRIS (MUST remove timezone offset from timestamp)
         # DFIR-IRIS wants: event_date='2025-10-24T18:41:50.290448' (no TZ) + event_tz='+00:00' (separate field)
-        if timestamp:
+        match = _TIMESTAMP_RE.match(timestamp) if timestamp else None
+        if match:
+            # Fast path: well-formed ISO timestamp, pad/truncate fraction to microseconds
+            fractional = (match.group('f') or '').ljust(6, '0')[:6]
+            timestamp = f"{match.group('d')}T{match.group('t')}.{fractional}"
+        elif timestamp:
             # Remove 'Z' suffix
             if timestamp.endswith('Z'):
                 timestamp = timestamp[:-1]
             # Remove +HH:MM or -HH:MM timezone offset
             if 'T' in timestamp:
                 date_part, time_part = timestamp.split('T', 1)
-                if '+' in time_part:
-                    time_part = time_part.split('+')[0]
-                elif '-' in time_part and time_part.count('-') > 0:
-                    # Check if it's a timezone (has colon after dash)
-                    parts = time_part.split('-')
-                    if len(parts) > 1 and ':' in parts[-1]:
-                        time_part = '-'.join(parts[:-1])
+                # An offset sign can only appear after HH:MM:SS (index 8+)
+                for sign in ('+', '-'):
+                    idx = time_part.rfind(sign)
+                    if idx > 7:
+                        time_part = time_part[:idx]
+                        break
                 timestamp = f"{date_part}T{time_part}"
             
             # Ensure microseconds format (.mmmmmm)
@@ -341,38 +677,17 @@ class DFIRIrisClient:
         formatted_title = f"{title} - {computer_name}" if computer_name else title
         
         # Get or create asset for hostname (using cache to avoid duplicates)
-        asset_ids = []
-        if computer_name:
-            # Strip domain suffix and clean hostname
-            hostname = computer_name.split('.')[0] if '.' in computer_name else computer_name
-            hostname = hostname.strip().upper()  # Normalize to uppercase for cache matching
-            
-            if hostname:
-                try:
-                    # Check cache first
-                    if hostname in asset_cache:
-                        asset_ids.append(asset_cache[hostname])
-                        logger.debug(f"[DFIR-IRIS] Using cached asset: {hostname} (ID: {asset_cache[hostname]})")
-                    else:
-                        # Not in cache - query/create
-                        asset_id = self.get_or_create_asset(case_id, hostname)
-                        if asset_id:
-                            asset_ids.append(asset_id)
-                            asset_cache[hostname] = asset_id  # Cache it
-                except Exception as e:
-                    logger.warning(f"[DFIR-IRIS] Failed to create/link asset {hostname}: {e}")
+        asset_id = self._resolve_event_asset(case_id, computer_name, asset_cache, create_assets)
+        asset_ids = [asset_id] if asset_id else []
         
         # Check if event exists by CaseScope ID (stored in event_tags)
-        result = self._request('GET', f'/case/timeline/events/list?cid={case_id}')
-        if result and 'data' in result and 'timeline' in result['data']:
-            for event in result['data']['timeline']:
-                # Check if this event is from CaseScope by matching the unique ID in tags
-                event_tags = event.get('event_tags', '')
-                if f'casescope_id:{casescope_event_id}' in event_tags:
-                    # Event already exists - skip to avoid duplicates
-                    event_id = event.get('event_id')
-                    logger.info(f"[DFIR-IRIS] Timeline event already exists (ID: {event_id}), skipping")
-                    return event_id
+        if existing_events_by_csid is None:
+            existing_events_by_csid = self.get_casescope_timeline_events(case_id)
+        if casescope_event_id in existing_events_by_csid:
+            # Event already exists - skip to avoid duplicates
+            event_id = existing_events_by_csid[casescope_event_id]
+            logger.info(f"[DFIR-IRIS] Timeline event already exists (ID: {event_id}), skipping")
+            return event_id
         
         # Create new timeline event
         data = {
@@ -383,7 +698,7 @@ class DFIRIrisClient:
             'event_assets': asset_ids,  # Link to hostname asset
             'event_source': 'Pushed from CaseScope',
             'event_content': f'Event from CaseScope\n\nComputer: {computer_name}\nTimestamp: {timestamp}',
-            'event_raw': json.dumps(raw_data, indent=2),  # Full event data in raw field
+            'event_raw': _json_dumps_pretty(raw_data),  # Full event data in raw field
             'event_iocs': ioc_ids,  # Note: plural 'event_iocs' not 'event_ioc'
             'event_in_summary': True,  # Show in case summary
             'event_tags': f'casescope_id:{casescope_event_id}',
@@ -394,24 +709,27 @@ class DFIRIrisClient:
         if result and 'data' in result:
             event_id = result['data'].get('event_id')
             logger.info(f"[DFIR-IRIS] Timeline event created: {event_id}")
+            existing_events_by_csid[casescope_event_id] = event_id
             return event_id
         
         return None
     
-    def remove_timeline_event(self, case_id: int, casescope_event_id: str) -> bool:
-        """Remove timeline event from DFIR-IRIS"""
-        # Find event by CaseScope ID - DFIR-IRIS returns data.timeline array
-        result = self._request('GET', f'/case/timeline/events/list?cid={case_id}')
-        if not result or 'data' not in result or 'timeline' not in result['data']:
-            return False
-        
-        for event in result['data']['timeline']:
-            if casescope_event_id in event.get('event_tags', ''):
-                event_id = event.get('event_id')
-                delete_data = {'cid': case_id}
-                if self._request('POST', f'/case/timeline/events/delete/{event_id}', delete_data):
-                    logger.info(f"[DFIR-IRIS] Timeline event removed: {event_id}")
-                    return True
+    def remove_timeline_event(self, case_id: int, casescope_event_id: str, iris_event_id: Optional[int] = None) -> bool:
+        """Remove timeline event from DFIR-IRIS
+        
+        iris_event_id: IRIS event ID if already known (e.g. from
+        get_casescope_timeline_events), avoids listing the timeline
+        """
+        if iris_event_id is None:
+            # Find event by exact CaseScope ID in event_tags
+            iris_event_id = self.get_casescope_timeline_events(case_id).get(casescope_event_id)
+            if iris_event_id is None:
+                return False
+        
+        delete_data = {'cid': case_id}
+        if self._request('POST', f'/case/timeline/events/delete/{iris_event_id}', delete_data):
+            logger.info(f"[DFIR-IRIS] Timeline event removed: {iris_event_id}")
+            return True
         
         return False
     
@@ -504,8 +822,6 @@ class DFIRIrisClient:
         1. Try common folder IDs (root case folder, standard subfolder IDs)
         2. Try without specifying a folder (let DFIR-IRIS decide)
         """
-        import os
-        
         logger.info(f"[DFIR-IRIS] Uploading file to datastore: {filename} for case {case_id}")
         
         # Check file exists
@@ -542,31 +858,29 @@ class DFIRIrisClient:
                 url = f"{self.url}/datastore/file/add/{folder_id}?cid={case_id}"
                 logger.info(f"[DFIR-IRIS] Attempt: {url}")
                 
-                with open(file_path, 'rb') as f:
-                    # DFIR-IRIS requires 'file_content' (not 'file') per official API docs
-                    files = {'file_content': (filename, f, 'application/octet-stream')}
-                    data = {
-                        'file_original_name': filename,  # Required
-                        'file_description': description or '',
-                        'file_password': '',  # Empty if no password
-                        'file_tags': 'casescope',
-                        'file_is_evidence': 'y',  # 'y' or 'n' (not 'on')
-                        'file_is_ioc': 'n'
-                    }
-                    
-                    response = requests.post(
+                data = {
+                    'file_original_name': filename,  # Required
+                    'file_description': description or '',
+                    'file_password': '',  # Empty if no password
+                    'file_tags': 'casescope',
+                    'file_is_evidence': 'y',  # 'y' or 'n' (not 'on')
+                    'file_is_ioc': 'n'
+                }
+                
+                # DFIR-IRIS requires 'file_content' (not 'file') per official API docs
+                # Body is streamed from disk so large evidence files are never held in memory
+                with _MultipartFileStream(data, 'file_content', filename, file_path) as body:
+                    response = self.session.post(
                         url,
-                        headers={'Authorization': f'Bearer {self.api_key}'},
-                        files=files,
-                        data=data,
-                        timeout=120,
-                        verify=False
+                        headers={'Content-Type': body.content_type},
+                        data=body,
+                        timeout=(10, 600)
                     )
                     
                     logger.info(f"[DFIR-IRIS] Response: {response.status_code}")
                     
                     if response.status_code == 200:
-                        result = response.json() if response.text else {}
+                        result = _json_loads(response.content) if response.content else {}
                         
                         if result.get('status') == 'success' and 'data' in result:
                             file_id = result['data'].get('file_id')
@@ -642,31 +956,101 @@ def sync_case_to_dfir_iris(db_session, opensearch_client, case_id: int, iris_cli
         except Exception as e:
             logger.warning(f"[DFIR-IRIS] Failed to sync case status (non-critical): {e}")
         
-        # 4. Sync IOCs
+        # 4. Sync IOCs (bounded concurrency - requests overlap on the pooled session)
+        # List IRIS IOCs once; sync_ioc adds newly created IOCs to the map
+        iris_iocs_by_value = iris_client.index_iocs_by_value(iris_client.get_case_iocs(iris_case_id))
         iocs = db_session.query(IOC).filter_by(case_id=case_id, is_active=True).all()
+        # ioc_value is not unique: rows sharing a value run in order on one worker, so
+        # the first creates the IRIS IOC and the rest update it (no duplicate creates)
+        ioc_groups = {}  # {ioc_value: [sync_ioc args, ...]}
         for ioc in iocs:
-            ioc_id = iris_client.sync_ioc(
-                iris_case_id,
-                ioc.ioc_value,
-                ioc.ioc_type,
-                ioc.description or '',
-                ioc.threat_level or 'medium'
+            ioc_groups.setdefault(ioc.ioc_value, []).append(
+                (iris_case_id, ioc.ioc_value, ioc.ioc_type, ioc.description or '', ioc.threat_level or 'medium',
+                 iris_iocs_by_value)
             )
-            if ioc_id:
-                results['iocs_synced'] += 1
+        
+        def sync_ioc_group(group):
+            return sum(1 for args in group if iris_client.sync_ioc(*args))
+        
+        with ThreadPoolExecutor(max_workers=IRIS_SYNC_CONCURRENCY) as executor:
+            results['iocs_synced'] += sum(executor.map(sync_ioc_group, ioc_groups.values()))
         
         # 5. Sync timeline events
-        tagged_events = db_session.query(TimelineTag).filter_by(case_id=case_id).all()
+        # Plain column rows (no ORM identity-map overhead)
+        tagged_events = db_session.query(TimelineTag).filter_by(case_id=case_id).with_entities(
+            TimelineTag.index_name,
+            TimelineTag.event_id
+        ).all()
+        
+        # Asset cache kept on the client: existing case assets are listed once per
+        # case and created ones added, so only new hostnames hit the API
+        asset_cache = iris_client.get_asset_cache(iris_case_id)  # {HOSTNAME: asset_id}
+        
+        # Every (index_name, event_id) still tagged in CaseScope - used when removing untagged events
+        tagged_now = {(t.index_name, t.event_id) for t in tagged_events}
+        
+        # Drop tags whose index no longer exists (deleted files) before fetching
+        existing_indices = set()
+        for index_name in {t.index_name for t in tagged_events}:
+            try:
+                if opensearch_client.indices.exists(index=index_name):
+                    existing_indices.add(index_name)
+            except Exception as e:
+                logger.warning(f"[DFIR-IRIS] Failed to check index {index_name}: {e}")
+        
+        skipped_tags = len(tagged_events)
+        tagged_events = [t for t in tagged_events if t.index_name in existing_indices]
+        skipped_tags -= len(tagged_events)
+        if skipped_tags:
+            logger.warning(f"[DFIR-IRIS] Skipping {skipped_tags} tagged events in missing indices")
+        
+        # List CaseScope events already in the IRIS timeline once for the whole sync.
+        # They are never re-pushed (sync_timeline_event skips them), so drop them
+        # before fetching documents and mapping IOCs
+        iris_events_by_csid = iris_client.get_casescope_timeline_events(iris_case_id)
+        pushed_csids = set(iris_events_by_csid)
+        
+        new_events = [t for t in tagged_events if f"{t.index_name}:{t.event_id}" not in pushed_csids]
+        results['events_synced'] += len(tagged_events) - len(new_events)
+        tagged_events = new_events
         
-        # Cache for assets created/found during this sync (to avoid re-querying DFIR-IRIS)
-        asset_cache = {}  # {hostname: asset_id}
+        # Load new tagged events from OpenSearch with batched mget calls per index
+        tags_by_index = {}
+        for tag in tagged_events:
+            tags_by_index.setdefault(tag.index_name, []).append(tag.event_id)
+        
+        event_sources = {}  # {(index_name, event_id): _source}
+        for index_name, event_ids in tags_by_index.items():
+            for start in range(0, len(event_ids), MGET_BATCH_SIZE):
+                try:
+                    response = opensearch_client.mget(
+                        index=index_name,
+                        body={'ids': event_ids[start:start + MGET_BATCH_SIZE]}
+                    )
+                    for doc in response.get('docs', []):
+                        if doc.get('found') and '_source' in doc:
+                            event_sources[(index_name, doc['_id'])] = doc['_source']
+                except Exception as e:
+                    logger.error(f"[DFIR-IRIS] Failed to load tagged events from {index_name}: {e}")
         
+        @lru_cache(maxsize=None)
+        def resolve_iris_ioc_ids(ioc_values: frozenset) -> Tuple[int, ...]:
+            """Map a set of IOC values to sorted IRIS IOC IDs (sorted for a deterministic event_iocs order)"""
+            ioc_ids = set()
+            for ioc_value in ioc_values:
+                iris_ioc = iris_iocs_by_value.get(ioc_value)
+                if iris_ioc and iris_ioc.get('ioc_id'):
+                    ioc_ids.add(iris_ioc['ioc_id'])
+            return tuple(sorted(ioc_ids, key=str))
+        
+        pending_events = []  # (casescope_id, event_data) for events not yet in IRIS
         for tag in tagged_events:
-            # Get event from OpenSearch
+            casescope_id = f"{tag.index_name}:{tag.event_id}"
+            
+            # Get event from prefetched OpenSearch documents
             try:
-                event = opensearch_client.get(index=tag.index_name, id=tag.event_id)
-                if event and '_source' in event:
-                    event_source = event['_source']
+                event_source = event_sources.get((tag.index_name, tag.event_id))
+                if event_source is not None:
                     
                     # Map CaseScope IOCs to DFIR-IRIS IOC IDs
                     ioc_iris_ids = []
@@ -676,33 +1060,21 @@ def sync_case_to_dfir_iris(db_session, opensearch_client, case_id: int, iris_cli
                         ioc_details = event_source.get('ioc_details', [])
                         
                         # Extract IOC values from both fields
-                        ioc_values = set()
-                        
                         # matched_iocs is list of IOC values
-                        if isinstance(matched_iocs, list):
-                            ioc_values.update(matched_iocs)
-                        
+                        ioc_values = set(matched_iocs) if isinstance(matched_iocs, list) else set()
+
                         # ioc_details is list of dicts with 'value' and 'type'
                         if isinstance(ioc_details, list):
-                            for ioc_detail in ioc_details:
-                                if isinstance(ioc_detail, dict) and 'value' in ioc_detail:
-                                    ioc_values.add(ioc_detail['value'])
+                            ioc_values.update(
+                                d['value'] for d in ioc_details
+                                if isinstance(d, dict) and 'value' in d
+                            )
                         
-                        if ioc_values:
-                            # Get all IRIS IOCs for this case (cache for efficiency)
-                            iris_iocs = iris_client.get_case_iocs(iris_case_id)
-                            
-                            # For each matched IOC value, find its IRIS ID
-                            for ioc_value in ioc_values:
-                                # Find matching IOC in IRIS by value
-                                for iris_ioc in iris_iocs:
-                                    if iris_ioc.get('ioc_value') == ioc_value:
-                                        ioc_id = iris_ioc.get('ioc_id')
-                                        if ioc_id and ioc_id not in ioc_iris_ids:
-                                            ioc_iris_ids.append(ioc_id)
-                                        break
+                        # Map matched IOC values to IRIS IDs (memoized - events often share IOC sets)
+                        ioc_iris_ids = list(resolve_iris_ioc_ids(frozenset(ioc_values)))
                         
-                        logger.debug(f"[DFIR-IRIS] Event {tag.event_id}: Found {len(ioc_values)} IOC values, mapped to {len(ioc_iris_ids)} IRIS IOC IDs")
+                        logger.debug("[DFIR-IRIS] Event %s: Found %d IOC values, mapped to %d IRIS IOC IDs",
+                                     tag.event_id, len(ioc_values), len(ioc_iris_ids))
                     except Exception as e:
                         logger.warning(f"[DFIR-IRIS] Failed to map IOCs for event {tag.event_id}: {e}")
                     
@@ -715,39 +1087,46 @@ def sync_case_to_dfir_iris(db_session, opensearch_client, case_id: int, iris_cli
                         'ioc_ids': ioc_iris_ids
                     }
                     
-                    iris_event_id = iris_client.sync_timeline_event(
-                        iris_case_id,
-                        event_data,
-                        f"{tag.index_name}:{tag.event_id}",
-                        asset_cache  # Pass asset cache to avoid duplicate creations
-                    )
-                    if iris_event_id:
-                        results['events_synced'] += 1
+                    pending_events.append((casescope_id, event_data))
             except Exception as e:
                 logger.error(f"[DFIR-IRIS] Failed to sync event {tag.event_id}: {e}")
         
+        # Push all new events in one concurrent batch
+        if pending_events:
+            iris_event_ids = iris_client.sync_timeline_events_bulk(
+                iris_case_id,
+                pending_events,
+                asset_cache,  # Pass asset cache to avoid duplicate creations
+                iris_events_by_csid
+            )
+            failed_events = 0
+            for casescope_id, _ in pending_events:
+                if iris_event_ids.get(casescope_id):
+                    results['events_synced'] += 1
+                else:
+                    failed_events += 1
+            
+            # Failed pushes may reference assets deleted in IRIS - start cold next sync
+            if failed_events:
+                iris_client.invalidate_asset_cache(iris_case_id)
+        
         # 6. Remove untagged events from DFIR-IRIS
-        # Get all timeline events from DFIR-IRIS
-        timeline_result = iris_client._request('GET', f'/cases/{iris_case_id}/timeline')
-        if timeline_result and 'data' in timeline_result:
-            for iris_event in timeline_result['data']:
-                if iris_event.get('event_source') == 'Pushed from CaseScope':
-                    # Check if this event is still tagged in CaseScope
-                    event_tags = iris_event.get('event_tags', '')
-                    if 'casescope_id:' in event_tags:
-                        casescope_id = event_tags.split('casescope_id:')[1].split()[0]
-                        
-                        # Check if still tagged
-                        index_name, event_id = casescope_id.split(':', 1)
-                        still_tagged = db_session.query(TimelineTag).filter_by(
-                            case_id=case_id,
-                            index_name=index_name,
-                            event_id=event_id
-                        ).first()
-                        
-                        if not still_tagged:
-                            if iris_client.remove_timeline_event(iris_case_id, casescope_id):
-                                results['events_removed'] += 1
+        # Reuse the timeline listing fetched before the event loop
+        untagged_csids = []
+        for casescope_id in pushed_csids:
+            # Check if still tagged
+            index_name, _, event_id = casescope_id.partition(':')
+            if (index_name, event_id) not in tagged_now:
+                untagged_csids.append(casescope_id)
+        
+        if untagged_csids:
+            with ThreadPoolExecutor(max_workers=IRIS_SYNC_CONCURRENCY) as executor:
+                for removed in executor.map(
+                    lambda csid: iris_client.remove_timeline_event(iris_case_id, csid, iris_events_by_csid.get(csid)),
+                    untagged_csids
+                ):
+                    if removed:
+                        results['events_removed'] += 1
         
         results['success'] = True
         logger.info(f"[DFIR-IRIS] Sync complete: Case {case_id} -> IRIS {iris_case_id}")
@@ -3,12 +3,159 @@ Event Deduplication Module
 Generates deterministic OpenSearch document IDs to prevent duplicate events
 """
 
+import base64
 import hashlib
+import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional speedup - fall back to stdlib json
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Document ID scheme marker, written right after the case prefix:
+#   case_<id>_d2_evt_<event_id>_<computer>_<timestamp>_<fingerprint>
+# d2 = canonical EventData walk + BLAKE2b-64, base64url. Unmarked IDs are the
+# original scheme (json.dumps + SHA-256[:16]); the two never match, so bump
+# this and index_version.CURRENT_INDEX_VERSION together on any format change.
+DEDUP_ID_SCHEME = "d2"
+
+# 64-bit fingerprint, written as 11 base64url chars
+DEDUP_DIGEST_SIZE = 8
+
+# Pre-initialised hasher; .copy() skips parameter-block setup on every event.
+# usedforsecurity=False: this is a fingerprint, so FIPS builds needn't gate it.
+_DEDUP_HASHER_TEMPLATE = hashlib.blake2b(digest_size=DEDUP_DIGEST_SIZE, usedforsecurity=False)
+_new_hasher = _DEDUP_HASHER_TEMPLATE.copy
+_b64encode = base64.urlsafe_b64encode
+
+
+# Characters not allowed in OpenSearch _id values, mapped to '_' in one pass
+_ID_SANITIZE = str.maketrans({'/': '_', '\\': '_', ':': '_', ' ': '_'})
+
+
+def _dumps_sorted(obj: Any) -> bytes:
+    """Key-sorted JSON bytes for the whole-event fallback hash (orjson when available)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+        except TypeError:
+            pass  # e.g. nesting too deep or out-of-range ints - use stdlib below
+    return json.dumps(obj, sort_keys=True, default=str).encode()
+
+
+def _digest_text(digest: bytes) -> str:
+    # base64url (A-Z a-z 0-9 - _) is _id-safe; the 12th char is only padding
+    return _b64encode(digest)[:11].decode('ascii')
+
+
+def _dedup_hash_text(data: bytes) -> str:
+    h = _new_hasher()
+    h.update(data)
+    return _digest_text(h.digest())
+
+
+def _content_fingerprint(obj: Any) -> str:
+    """Fingerprint text of event content (canonical walk + BLAKE2b-64)"""
+    h = _new_hasher()
+    _feed_canonical(obj, h.update)
+    return _digest_text(h.digest())
+
+
+# Per-file fingerprint cache for repeated EventData payloads
+FINGERPRINT_CACHE_SIZE = 8192     # Entries kept before the cache is reset
+FINGERPRINT_CACHE_PROBE = 2000    # Lookups before judging the hit rate
+FINGERPRINT_CACHE_MIN_HIT_RATE = 0.25  # Below this a miss costs more than hits save
+
+
+class _FingerprintCache:
+    """
+    Fingerprints keyed by EventData string, for one ingest file.
+    
+    EventData reaches ID generation as a JSON string (normalize_event_structure),
+    and chatty channels repeat identical payloads. A hit skips the hash, but a
+    miss costs an extra string hash, so after FINGERPRINT_CACHE_PROBE lookups
+    the cache turns itself off for files that don't repeat enough.
+    """
+    
+    def __init__(self):
+        self.enabled = True
+        self.lookups = 0
+        self.hits = 0
+        self._entries: Dict[str, str] = {}
+    
+    def fingerprint(self, payload: str) -> str:
+        if not self.enabled:
+            return _content_fingerprint(payload)
+        
+        self.lookups += 1
+        entries = self._entries
+        text = entries.get(payload)
+        if text is not None:
+            self.hits += 1
+        else:
+            text = _content_fingerprint(payload)
+            if len(entries) >= FINGERPRINT_CACHE_SIZE:
+                entries.clear()
+            entries[payload] = text
+        
+        if self.lookups == FINGERPRINT_CACHE_PROBE:
+            hit_rate = self.hits / self.lookups
+            self.enabled = hit_rate >= FINGERPRINT_CACHE_MIN_HIT_RATE
+            logger.info(f"[DEDUP] EventData fingerprint cache: {hit_rate:.0%} hits over {self.lookups:,} events - "
+                        f"{'keeping' if self.enabled else 'disabling'} cache")
+            if not self.enabled:
+                entries.clear()
+        return text
+
+
+def _feed_canonical(obj: Any, update) -> None:
+    """
+    Feed obj to a hasher's update method in canonical order (sorted dict
+    keys), without building an intermediate JSON string.
+    
+    Every value is type-tagged and strings are length-prefixed, so distinct
+    structures ("1" vs 1, ["a", "b"] vs ["ab"]) never hash the same.
+    """
+    # Hot per-event walker: takes the bound update method and writes each
+    # string (and each dict key) with a single update() call. Exact type()
+    # checks first (JSON-decoded data); subclasses fall through to the end
+    obj_type = type(obj)
+    if obj_type is str:
+        data = obj.encode('utf-8', 'surrogatepass')
+        update(b's%d:%b' % (len(data), data))
+    elif obj_type is dict:
+        update(b'{%d:' % len(obj))
+        for key in sorted(obj, key=str):
+            data = str(key).encode('utf-8', 'surrogatepass')
+            update(b's%d:%b' % (len(data), data))
+            _feed_canonical(obj[key], update)
+    elif obj_type is list or obj_type is tuple:
+        update(b'[%d:' % len(obj))
+        for item in obj:
+            _feed_canonical(item, update)
+    elif obj is None:
+        update(b'n')
+    elif obj is True:
+        update(b't')
+    elif obj is False:
+        update(b'f')
+    elif obj_type is int or obj_type is float:
+        update(b'#' + str(obj).encode() + b';')
+    elif isinstance(obj, str):
+        _feed_canonical(str(obj), update)
+    elif isinstance(obj, dict):
+        _feed_canonical(dict(obj), update)
+    elif isinstance(obj, (list, tuple)):
+        _feed_canonical(list(obj), update)
+    elif isinstance(obj, (int, float)):
+        update(b'#' + str(obj).encode() + b';')
+    else:
+        _feed_canonical(str(obj), update)
+
 
 def generate_event_document_id(
     case_id: int,
@@ -37,33 +184,158 @@ def generate_event_document_id(
     Returns:
         Deterministic document ID string
     """
-    import json
+    return _build_document_id(f"case_{case_id}", event)
+
+
+def make_id_generator(
+    case_id: int,
+    source_file_type: Optional[str] = None,
+    use_dedup: bool = True
+) -> Callable[[Dict[str, Any]], Optional[str]]:
+    """
+    Build a document ID generator specialised for one file's source type
+    
+    Ingest knows the file type up front, so the returned function skips the
+    EventData lookups CSV/IIS rows never have (and vice versa) and has the
+    case prefix pre-bound. IDs are identical to generate_event_document_id().
+    
+    With use_dedup=False the generator does no work and returns None: leave
+    _id unset and OpenSearch auto-generates it on its append-only path
+    (no per-document version lookup, unlike any client-side ID).
+    
+    Args:
+        case_id: Case ID
+        source_file_type: 'EVTX', 'JSON', 'EDR', 'CSV', 'IIS' (None = any)
+        use_dedup: False when deduplication is off (see should_deduplicate_events())
+    
+    Returns:
+        Function mapping a normalized event to its document ID (or None);
+        it optionally takes the NormalizedFields from normalize_event_fields()
+    """
+    if not use_dedup:
+        return _no_document_id
+    
+    case_prefix = f"case_{case_id}"
+    extract = _CONTENT_BY_SOURCE_TYPE.get(source_file_type, _event_content)
+    build = _build_document_id
+    cache = _FingerprintCache()
+    
+    def generate(event: Dict[str, Any], fields: Optional[tuple] = None) -> str:
+        return build(case_prefix, event, extract, fields, cache)
+    
+    return generate
+
+
+def generate_event_document_ids(
+    case_id: int,
+    events: Iterable[Dict[str, Any]],
+    source_file_type: Optional[str] = None
+) -> List[str]:
+    """
+    Batch form of generate_event_document_id() for callers that already hold
+    a file's events in memory (e.g. parsed IIS logs)
+    
+    Produces exactly the same IDs as the per-event call, with the per-case
+    setup done once per batch instead of once per event.
+    
+    Args:
+        case_id: Case ID
+        events: Event dictionaries (should have normalized fields)
+        source_file_type: Source type shared by all events (see make_id_generator())
+    
+    Returns:
+        Document IDs, in the same order as events
+    """
+    generate = make_id_generator(case_id, source_file_type)
+    return [generate(event) for event in events]
+
+
+def _no_document_id(event: Dict[str, Any], fields: Optional[tuple] = None) -> None:
+    """Deduplication off: let OpenSearch assign the _id"""
+    return None
+
+
+# Metadata fields left out of the CSV/IIS content hash
+# v1.14.0: IIS logs also exclude 'System' block (artificially added for timestamp normalization)
+_CONTENT_EXCLUDE_FIELDS = frozenset({
+    'source_file', 'source_file_type', 'normalized_timestamp',
+    'normalized_computer', 'normalized_event_id', 'indexed_at',
+    'System', 'row_number', 'file_id', 'opensearch_key',
+    'has_ioc', 'has_sigma'
+})
+
+
+def _event_content(event: Dict[str, Any]) -> Any:
+    """Content that makes an event unique, for any source type"""
+    # Priority 1: Direct EventData field
+    if 'EventData' in event:
+        return event['EventData']
+    # Priority 2: Event.EventData (nested structure)
+    wrapped = event.get('Event')
+    if type(wrapped) is dict:
+        return wrapped.get('EventData', {})
+    # Priority 3: For CSV/IIS/non-Windows events, use all event fields except metadata
+    if event.get('source_file_type') in ('CSV', 'IIS'):
+        return _flat_content(event)
+    return {}
+
+
+def _evtx_content(event: Dict[str, Any]) -> Any:
+    """EVTX/JSON/EDR files: EventData or Event.EventData only"""
+    if 'EventData' in event:
+        return event['EventData']
+    wrapped = event.get('Event')
+    if type(wrapped) is dict:
+        return wrapped.get('EventData', {})
+    return {}
+
+
+def _flat_content(event: Dict[str, Any]) -> Any:
+    """CSV/IIS rows: every non-metadata field (unless the row carries EventData)"""
+    if 'EventData' in event or type(event.get('Event')) is dict:
+        return _evtx_content(event)
+    exclude = _CONTENT_EXCLUDE_FIELDS
+    return {k: v for k, v in event.items() if k not in exclude}
+
+
+_CONTENT_BY_SOURCE_TYPE = {
+    'EVTX': _evtx_content,
+    'JSON': _evtx_content,
+    'EDR': _evtx_content,
+    'CSV': _flat_content,
+    'IIS': _flat_content,
+}
+
+
+def _build_document_id(
+    case_prefix: str,
+    event: Dict[str, Any],
+    extract: Callable[[Dict[str, Any]], Any] = _event_content,
+    fields: Optional[tuple] = None,
+    cache: Optional[_FingerprintCache] = None
+) -> str:
+    """
+    Build the dedup _id for one event; case_prefix is 'case_<id>'
     
+    fields: NormalizedFields (timestamp, computer, event_id, ...) returned by
+    normalize_event_fields(), read instead of the normalized_* event keys
+    cache: per-file fingerprint cache for string EventData payloads
+    """
     # Get normalized fields (should be added by normalize_event())
-    normalized_ts = event.get('normalized_timestamp', '')
+    if fields is not None:
+        normalized_ts, normalized_computer, normalized_event_id = fields[0], fields[1] or 'unknown', fields[2] or 'unknown'
+    else:
+        get = event.get
+        normalized_ts = get('normalized_timestamp')
+        normalized_computer = get('normalized_computer', 'unknown')
+        normalized_event_id = get('normalized_event_id', 'unknown')
     # Normalize timestamp to seconds (ignore milliseconds for deduplication)
-    normalized_ts_seconds = normalized_ts[:19] if normalized_ts and len(normalized_ts) >= 19 else (normalized_ts or 'unknown')
-    normalized_computer = event.get('normalized_computer', 'unknown')
-    normalized_event_id = event.get('normalized_event_id', 'unknown')
+    normalized_ts_seconds = (normalized_ts or '')[:19] or 'unknown'
     
     # Extract EventData (core event content - this is what makes events unique)
     event_data = {}
     try:
-        # Priority 1: Direct EventData field
-        if 'EventData' in event:
-            event_data = event['EventData']
-        # Priority 2: Event.EventData (nested structure)
-        elif 'Event' in event and isinstance(event['Event'], dict):
-            event_data = event['Event'].get('EventData', {})
-        # Priority 3: For CSV/IIS/non-Windows events, use all event fields except metadata
-        elif event.get('source_file_type') in ['CSV', 'IIS']:
-            # For CSV and IIS, exclude metadata fields and use content fields
-            # v1.14.0: IIS logs also exclude 'System' block (artificially added for timestamp normalization)
-            exclude_fields = {'source_file', 'source_file_type', 'normalized_timestamp', 
-                            'normalized_computer', 'normalized_event_id', 'indexed_at', 
-                            'System', 'row_number', 'file_id', 'opensearch_key', 
-                            'has_ioc', 'has_sigma'}
-            event_data = {k: v for k, v in event.items() if k not in exclude_fields}
+        event_data = extract(event)
     except Exception as e:
         logger.debug(f"[DEDUP] Could not extract EventData: {e}")
     
@@ -71,31 +343,32 @@ def generate_event_document_id(
     # Sort keys for consistency (same data = same hash regardless of field order)
     try:
         if event_data:
-            event_data_json = json.dumps(event_data, sort_keys=True, default=str)
-            event_data_hash = hashlib.sha256(event_data_json.encode()).hexdigest()[:16]
+            if cache is not None and type(event_data) is str:
+                event_data_hash = cache.fingerprint(event_data)
+            else:
+                event_data_hash = _content_fingerprint(event_data)
         else:
             # Fallback: hash of normalized fields if no EventData
             fallback_str = f"{normalized_ts_seconds}|{normalized_computer}|{normalized_event_id}"
-            event_data_hash = hashlib.sha256(fallback_str.encode()).hexdigest()[:16]
+            event_data_hash = _dedup_hash_text(fallback_str.encode())
     except Exception as e:
         logger.warning(f"[DEDUP] Error creating EventData hash: {e}")
         # Final fallback: hash of entire event (less accurate but safe)
-        event_str = json.dumps(event, sort_keys=True, default=str)
-        event_data_hash = hashlib.sha256(event_str.encode()).hexdigest()[:16]
+        event_data_hash = _dedup_hash_text(_dumps_sorted(event))
     
-    # Build deterministic ID: case + event_id + computer + normalized_timestamp + event_data_hash
+    # Build deterministic ID: case + scheme + event_id + computer + normalized_timestamp + event_data_hash
     id_parts = [
-        f"case_{case_id}",
+        case_prefix,
+        DEDUP_ID_SCHEME,
         f"evt_{normalized_event_id}",
         normalized_computer,
         normalized_ts_seconds,
         event_data_hash
     ]
-    doc_id = '_'.join(str(p) for p in id_parts if p)
+    doc_id = '_'.join([str(p) for p in id_parts if p])
     
     # Sanitize for OpenSearch _id (no special chars, max 512 bytes)
-    doc_id = doc_id.replace('/', '_').replace('\\', '_').replace(':', '_').replace(' ', '_')
-    doc_id = doc_id[:200]  # Well within OpenSearch 512 byte limit
+    doc_id = doc_id.translate(_ID_SANITIZE)[:200]  # Well within OpenSearch 512 byte limit
     
     return doc_id
 
@@ -4,11 +4,192 @@ Normalize event fields during ingestion for consistent search/display
 """
 
 from datetime import datetime
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, NamedTuple, Optional, Tuple
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Fixed-width ISO 8601 shape emitted by the EVTX parser
+# ("2025-10-24T18:41:50.2904481Z"). Days above 28 fall through to datetime
+# so month-length validation stays exact.
+_ISO_FAST_RE = re.compile(
+    r'(\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|1\d|2[0-8]))T'
+    r'((?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d)'
+    r'(?:\.(\d+))?'
+    r'(Z|[+-](?:[01]\d|2[0-3]):[0-5]\d)?$'
+)
+_iso_fast_match = _ISO_FAST_RE.match
+
+# CSV/Firewall formats (MM/DD/YYYY HH:MM:SS or similar), in preference order
+_CSV_DATE_FORMATS = (
+    '%m/%d/%Y %H:%M:%S',      # SonicWall: 10/15/2025 12:35:21
+    '%m/%d/%Y %H:%M',          # MM/DD/YYYY HH:MM
+    '%d/%m/%Y %H:%M:%S',      # DD/MM/YYYY HH:MM:SS
+    '%Y/%m/%d %H:%M:%S',      # YYYY/MM/DD HH:MM:SS
+    '%m-%d-%Y %H:%M:%S',      # MM-DD-YYYY HH:MM:SS
+    '%Y-%m-%d %H:%M:%S'       # YYYY-MM-DD HH:MM:SS
+)
+
+# Slash-separated CSV shapes (formats 0-3 above) in one match; the year's
+# position and the value ranges decide which format applies
+_CSV_SLASH_RE = re.compile(r'(\d{1,4})/(\d{1,2})/(\d{1,4}) (\d{1,2}):(\d{1,2})(?::(\d{1,2}))?$')
+_csv_slash_match = _CSV_SLASH_RE.match
+
+# Try order per previously-winning format: the winner goes first. DD/MM only
+# follows MM/DD so ambiguous dates (03/04/2025) keep parsing as MM/DD.
+def _csv_format_order(hint: int) -> tuple:
+    ahead = (0, hint) if hint == 2 else (hint,)
+    return ahead + tuple(i for i in range(len(_CSV_DATE_FORMATS)) if i not in ahead)
+
+
+_CSV_FORMAT_ORDERS = tuple(_csv_format_order(hint) for hint in range(len(_CSV_DATE_FORMATS)))
+
+# Winning CSV format index per source_file_type (files rarely mix formats)
+_csv_format_hints: Dict[Optional[str], int] = {}
+
+# Priority 3 field names, in priority order (first non-empty value wins)
+_TIMESTAMP_FIELDS = (
+    '@timestamp', 'timestamp', 'Time', 'time', 'datetime',
+    'TimeCreated', 'timeCreated', 'event_time', 'eventtime',
+    'created_at', 'createdAt', 'date', 'Date',
+    'TIME_CREATED', 'CreatedDate', 'created'
+)
+
+_COMPUTER_FIELDS = (
+    'computer_name', 'ComputerName', 'computername',
+    'hostname', 'Hostname', 'host_name', 'HostName',
+    'machine', 'Machine', 'device', 'Device',
+    'agent', 'Agent', 'host', 'Host',
+    'Dst. Name',  # SonicWall CSV
+    'Source Name', 'Destination Name'
+)
+
+_EVENT_ID_FIELDS = (
+    'event_id', 'eventid', 'EventID', 'event.id',
+    'Event',  # SonicWall CSV (event type like "Port Scan Possible")
+    'ID',     # SonicWall CSV (numeric ID)
+    'event_type', 'EventType', 'event_name', 'EventName'
+)
+
+# CSV columns that identify a firewall export
+_FIREWALL_FIELDS = ('Src. IP', 'Dst. IP', 'Firewall', 'Category', 'Group')
+
+
+def _fast_csv_timestamp(ts_str: str) -> Optional[str]:
+    """
+    Parse the slash CSV formats without strptime, preferring MM/DD over
+    DD/MM exactly like the format list. Returns None when undecided.
+    """
+    match = _csv_slash_match(ts_str)
+    if not match:
+        return None
+    first, second, third, hour, minute, second_of_minute = match.groups()
+    hour, minute = int(hour), int(minute)
+    
+    if len(third) == 4 and len(first) <= 2:
+        year = int(third)
+        first, second = int(first), int(second)
+        if second_of_minute is None:
+            candidates = ((first, second, 0),)                  # MM/DD/YYYY HH:MM
+        else:
+            sec = int(second_of_minute)
+            candidates = ((first, second, sec), (second, first, sec))  # MM/DD, then DD/MM
+    elif len(first) == 4 and len(third) <= 2 and second_of_minute is not None:
+        year = int(first)
+        candidates = ((int(second), int(third), int(second_of_minute)),)  # YYYY/MM/DD
+    else:
+        return None
+    
+    for month, day, sec in candidates:
+        try:
+            return datetime(year, month, day, hour, minute, sec).isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _fast_iso_timestamp(ts_str: str) -> Optional[str]:
+    """
+    Rebuild datetime.fromisoformat(ts).isoformat() by slicing, without a
+    datetime round-trip. Returns None for shapes that need the full parser.
+    """
+    match = _iso_fast_match(ts_str)
+    if not match:
+        return None
+    date_part, time_part, fraction, tz = match.groups()
+    result = date_part + 'T' + time_part
+    if fraction:
+        micros = fraction[:6].ljust(6, '0')
+        if micros != '000000':
+            result += '.' + micros
+    if tz:
+        result += '+00:00' if tz == 'Z' or tz == '-00:00' else tz
+    return result
+
+
+def _system_time(system: Dict[str, Any]) -> Any:
+    """SystemTime from an EVTX System block (#attributes or @attributes)"""
+    time_created = system.get('TimeCreated')
+    if type(time_created) is not dict:
+        return None
+    attributes = time_created.get('#attributes')
+    value = attributes.get('SystemTime') if type(attributes) is dict else None
+    if not value:
+        attributes = time_created.get('@attributes')
+        value = attributes.get('SystemTime') if type(attributes) is dict else None
+    return value
+
+
+def _system_event_id(system: Dict[str, Any]) -> Optional[str]:
+    """EventID from an EVTX System block (plain value or {'#text': ...})"""
+    if 'EventID' not in system:
+        return None
+    event_id_raw = system['EventID']
+    if type(event_id_raw) is dict:
+        return _event_id_text(event_id_raw.get('#text', event_id_raw.get('text', '')))
+    return _event_id_text(event_id_raw)
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _canon_event_id(event_id_raw: Any) -> str:
+    """str() of a non-string EventID; an EVTX file repeats a few hundred IDs"""
+    return str(event_id_raw)
+
+
+def _event_id_text(event_id_raw: Any) -> str:
+    """Event ID as text (strings pass through, other scalars via the cache)"""
+    if type(event_id_raw) is str:
+        return event_id_raw
+    try:
+        return _canon_event_id(event_id_raw)
+    except TypeError:  # unhashable (list, nested dict)
+        return str(event_id_raw)
+
+
+def _event_systems(event: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    (System, Event.System) blocks of an event, each None when absent
+    
+    Looked up once per event and shared by the timestamp, computer and event
+    ID extractors (Priority 1 and Priority 2 respectively).
+    
+    Events come from json.loads / csv.DictReader / the IIS parser, so nested
+    containers are exact dicts and type() checks are safe (and cheaper than
+    isinstance() when they fail, which is the common case here).
+    """
+    system = event.get('System')
+    if type(system) is not dict:
+        system = None
+    wrapped_system = None
+    wrapped = event.get('Event')
+    if type(wrapped) is dict:
+        wrapped_system = wrapped.get('System')
+        if type(wrapped_system) is not dict:
+            wrapped_system = None
+    return system, wrapped_system
+
 
 def normalize_event_timestamp(event: Dict[str, Any]) -> Optional[str]:
     """
@@ -16,30 +197,28 @@ def normalize_event_timestamp(event: Dict[str, Any]) -> Optional[str]:
     
     Returns ISO 8601 timestamp string or None
     """
+    return _normalize_timestamp(event, *_event_systems(event))
+
+
+def _normalize_timestamp(event: Dict[str, Any], system: Optional[Dict[str, Any]],
+                         wrapped_system: Optional[Dict[str, Any]]) -> Optional[str]:
+    get = event.get
     timestamp_value = None
     
     # Priority 1: EVTX structure - System.TimeCreated.#attributes.SystemTime or @attributes.SystemTime
-    if 'System' in event:
-        time_created = event.get('System', {}).get('TimeCreated', {})
-        timestamp_value = time_created.get('#attributes', {}).get('SystemTime') or time_created.get('@attributes', {}).get('SystemTime')
+    if system is not None:
+        timestamp_value = _system_time(system)
     
     # Priority 2: EVTX->JSON import - Event.System.TimeCreated
-    if not timestamp_value and 'Event' in event and isinstance(event.get('Event'), dict):
-        time_created = event.get('Event', {}).get('System', {}).get('TimeCreated', {})
-        timestamp_value = time_created.get('#attributes', {}).get('SystemTime') or time_created.get('@attributes', {}).get('SystemTime')
+    if not timestamp_value and wrapped_system is not None:
+        timestamp_value = _system_time(wrapped_system)
     
     # Priority 3: Common timestamp field names (including CSV)
     if not timestamp_value:
-        timestamp_fields = [
-            '@timestamp', 'timestamp', 'Time', 'time', 'datetime',
-            'TimeCreated', 'timeCreated', 'event_time', 'eventtime',
-            'created_at', 'createdAt', 'date', 'Date',
-            'TIME_CREATED', 'CreatedDate', 'created'
-        ]
-        
-        for field in timestamp_fields:
-            if field in event and event[field]:
-                timestamp_value = event[field]
+        for field in _TIMESTAMP_FIELDS:
+            value = get(field)
+            if value:
+                timestamp_value = value
                 break
     
     # Convert to ISO format
@@ -49,6 +228,12 @@ def normalize_event_timestamp(event: Dict[str, Any]) -> Optional[str]:
             
             # Already ISO format (with T separator)
             if 'T' in ts_str:
+                # Fast path: dominant EVTX shape, sliced without datetime
+                if len(ts_str) >= 19 and ts_str[4] == '-' and ts_str[10] == 'T':
+                    fast = _fast_iso_timestamp(ts_str)
+                    if fast:
+                        return fast
+                
                 # Normalize timezone
                 ts_str = ts_str.replace('Z', '+00:00')
                 dt = datetime.fromisoformat(ts_str)
@@ -70,22 +255,23 @@ def normalize_event_timestamp(event: Dict[str, Any]) -> Optional[str]:
             
             # CSV/Firewall formats (MM/DD/YYYY HH:MM:SS or similar)
             else:
-                # Try common CSV date formats
-                date_formats = [
-                    '%m/%d/%Y %H:%M:%S',      # SonicWall: 10/15/2025 12:35:21
-                    '%m/%d/%Y %H:%M',          # MM/DD/YYYY HH:MM
-                    '%d/%m/%Y %H:%M:%S',      # DD/MM/YYYY HH:MM:SS
-                    '%Y/%m/%d %H:%M:%S',      # YYYY/MM/DD HH:MM:SS
-                    '%m-%d-%Y %H:%M:%S',      # MM-DD-YYYY HH:MM:SS
-                    '%Y-%m-%d %H:%M:%S'       # YYYY-MM-DD HH:MM:SS
-                ]
+                # Fast path: slash formats via one regex + datetime constructor
+                fast = _fast_csv_timestamp(ts_str)
+                if fast:
+                    return fast
+                
+                # Try common CSV date formats, previously-winning format first
+                source_type = get('source_file_type')
+                hint = _csv_format_hints.get(source_type, 0)
                 
-                for fmt in date_formats:
+                for index in _CSV_FORMAT_ORDERS[hint]:
                     try:
-                        dt = datetime.strptime(ts_str, fmt)
-                        return dt.isoformat()
-                    except:
+                        dt = datetime.strptime(ts_str, _CSV_DATE_FORMATS[index])
+                    except ValueError:
                         continue
+                    if index != hint:
+                        _csv_format_hints[source_type] = index
+                    return dt.isoformat()
         
         except Exception as e:
             logger.debug(f"[NORMALIZE] Could not parse timestamp '{timestamp_value}': {e}")
@@ -99,43 +285,41 @@ def normalize_event_computer(event: Dict[str, Any]) -> Optional[str]:
     
     Returns computer name string or None
     """
+    return _normalize_computer(event, *_event_systems(event))
+
+
+def _normalize_computer(event: Dict[str, Any], system: Optional[Dict[str, Any]],
+                        wrapped_system: Optional[Dict[str, Any]]) -> Optional[str]:
+    get = event.get
     computer_name = None
     
     # Priority 1: EVTX structure - System.Computer
-    if 'System' in event:
-        computer_name = event.get('System', {}).get('Computer')
+    if system is not None:
+        computer_name = system.get('Computer')
     
     # Priority 2: EVTX->JSON import - Event.System.Computer
-    if not computer_name and 'Event' in event and isinstance(event.get('Event'), dict):
-        computer_name = event.get('Event', {}).get('System', {}).get('Computer')
+    if not computer_name and wrapped_system is not None:
+        computer_name = wrapped_system.get('Computer')
     
     # Priority 3: Common computer field names (including CSV/Firewall)
     if not computer_name:
-        computer_fields = [
-            'computer_name', 'ComputerName', 'computername',
-            'hostname', 'Hostname', 'host_name', 'HostName',
-            'machine', 'Machine', 'device', 'Device',
-            'agent', 'Agent', 'host', 'Host',
-            'Dst. Name',  # SonicWall CSV
-            'Source Name', 'Destination Name'
-        ]
-        
-        for field in computer_fields:
-            value = event.get(field)
+        for field in _COMPUTER_FIELDS:
+            value = get(field)
             if value:
                 # Handle nested dict (e.g., {"host": {"name": "server1"}})
-                if isinstance(value, dict):
-                    computer_name = value.get('name') or value.get('hostname')
-                elif isinstance(value, str):
+                value_type = type(value)
+                if value_type is str:
                     computer_name = value
+                elif value_type is dict:
+                    computer_name = value.get('name') or value.get('hostname')
                 
                 if computer_name:
                     break
     
     # Fallback for firewall logs: use device type
-    if not computer_name and event.get('source_file_type') == 'CSV':
+    if not computer_name and get('source_file_type') == 'CSV':
         # Check if this looks like a firewall log
-        if any(field in event for field in ['Src. IP', 'Dst. IP', 'Firewall', 'Category', 'Group']):
+        if any(field in event for field in _FIREWALL_FIELDS):
             computer_name = 'Firewall'
     
     return computer_name if computer_name else None
@@ -147,46 +331,72 @@ def normalize_event_id(event: Dict[str, Any]) -> Optional[str]:
     
     Returns event ID string or None
     """
+    return _normalize_event_id(event, *_event_systems(event))
+
+
+def _normalize_event_id(event: Dict[str, Any], system: Optional[Dict[str, Any]],
+                        wrapped_system: Optional[Dict[str, Any]]) -> Optional[str]:
+    get = event.get
     event_id = None
     
     # Priority 1: EVTX structure - System.EventID
-    if 'System' in event and 'EventID' in event.get('System', {}):
-        event_id_raw = event['System']['EventID']
-        if isinstance(event_id_raw, dict):
-            event_id = str(event_id_raw.get('#text', event_id_raw.get('text', '')))
-        else:
-            event_id = str(event_id_raw)
+    if system is not None:
+        event_id = _system_event_id(system)
     
     # Priority 2: EVTX->JSON import - Event.System.EventID
-    if not event_id and 'Event' in event and isinstance(event.get('Event'), dict):
-        if 'System' in event['Event'] and 'EventID' in event['Event']['System']:
-            event_id_raw = event['Event']['System']['EventID']
-            if isinstance(event_id_raw, dict):
-                event_id = str(event_id_raw.get('#text', event_id_raw.get('text', '')))
-            else:
-                event_id = str(event_id_raw)
+    if not event_id and wrapped_system is not None:
+        event_id = _system_event_id(wrapped_system)
     
     # Priority 3: Common event ID field names (including CSV)
     if not event_id:
-        event_id_fields = [
-            'event_id', 'eventid', 'EventID', 'event.id',
-            'Event',  # SonicWall CSV (event type like "Port Scan Possible")
-            'ID',     # SonicWall CSV (numeric ID)
-            'event_type', 'EventType', 'event_name', 'EventName'
-        ]
-        for field in event_id_fields:
-            if field in event and event[field]:
-                event_id = str(event[field])
+        for field in _EVENT_ID_FIELDS:
+            value = get(field)
+            if value:
+                event_id = _event_id_text(value)
                 break
     
     # Fallback for CSV: use 'Event' field if it exists
-    if not event_id and event.get('source_file_type') == 'CSV':
-        if 'Event' in event and event['Event']:
+    if not event_id and get('source_file_type') == 'CSV':
+        if get('Event'):
             event_id = 'CSV'  # Generic CSV identifier
     
     return event_id if event_id else None
 
 
+def _collect_text(root: Any, texts: list) -> None:
+    """
+    Append every text leaf under root to texts, in document order
+    
+    Iterative (explicit stack) so deep EventData trees don't cost a Python
+    frame and a temporary list per node. Nodes deeper than 10 levels are
+    skipped, as before.
+    """
+    stack = [(root, 0)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        obj, depth = pop()
+        if depth > 10:  # Prevent runaway nesting
+            continue
+        obj_type = type(obj)
+        if obj_type is str:
+            texts.append(obj)
+        elif obj_type is dict:
+            for child in reversed(list(obj.values())):
+                push((child, depth + 1))
+        elif obj_type is list:
+            for child in reversed(obj):
+                push((child, depth + 1))
+        elif obj is None:
+            continue
+        elif isinstance(obj, str):
+            texts.append(str(obj))
+        elif isinstance(obj, (dict, list)):  # Subclass: walk it as the base type
+            push((dict(obj) if isinstance(obj, dict) else list(obj), depth))
+        else:
+            texts.append(str(obj))
+
+
 def create_search_blob(event: Dict[str, Any]) -> str:
     """
     Create flattened search blob from nested event data
@@ -209,72 +419,96 @@ def create_search_blob(event: Dict[str, Any]) -> str:
     Returns:
         Flattened, normalized text string for searching
     """
-    def extract_text(obj, depth=0):
-        """Recursively extract text from nested structures"""
-        if depth > 10:  # Prevent infinite recursion
-            return ""
-        
-        if isinstance(obj, str):
-            # Normalize line breaks and extra whitespace
-            text = obj.replace('\\r\\n', ' ').replace('\\n', ' ').replace('\\r', ' ')
-            text = text.replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ')
-            return text
-        elif isinstance(obj, dict):
-            # Recursively extract from all dict values
-            texts = []
-            for v in obj.values():
-                text = extract_text(v, depth + 1)
-                if text:
-                    texts.append(text)
-            return ' '.join(texts)
-        elif isinstance(obj, list):
-            # Extract from all list items
-            texts = []
-            for item in obj:
-                text = extract_text(item, depth + 1)
-                if text:
-                    texts.append(text)
-            return ' '.join(texts)
-        else:
-            return str(obj) if obj is not None else ""
-    
     # Extract from key searchable fields
-    blob_parts = []
+    texts = []
     
     # EVTX EventData (stringified JSON or object)
     if 'EventData' in event:
-        blob_parts.append(extract_text(event['EventData']))
+        _collect_text(event['EventData'], texts)
     
     # Application log Data field (nested arrays with #text)
     if 'Data' in event:
-        blob_parts.append(extract_text(event['Data']))
+        _collect_text(event['Data'], texts)
     
     # UserData (less common but searchable)
     if 'UserData' in event:
-        blob_parts.append(extract_text(event['UserData']))
+        _collect_text(event['UserData'], texts)
     
     # Message field (common in EDR/JSON)
     if 'message' in event:
-        blob_parts.append(extract_text(event['message']))
+        _collect_text(event['message'], texts)
     
     # Event.EventData for wrapped structures
-    if 'Event' in event and isinstance(event.get('Event'), dict):
+    if type(event.get('Event')) is dict:
         if 'EventData' in event['Event']:
-            blob_parts.append(extract_text(event['Event']['EventData']))
+            _collect_text(event['Event']['EventData'], texts)
         if 'UserData' in event['Event']:
-            blob_parts.append(extract_text(event['Event']['UserData']))
+            _collect_text(event['Event']['UserData'], texts)
+    
+    # Join all parts once, then normalize escaped line breaks (literal \\r\\n)
+    search_blob = ' '.join(texts)
+    if '\\' in search_blob:
+        search_blob = search_blob.replace('\\r\\n', ' ').replace('\\n', ' ').replace('\\r', ' ')
     
-    # Join all parts and normalize whitespace
-    search_blob = ' '.join(blob_parts)
+    # Real \r/\n are whitespace to split(), so this also flattens line breaks
     search_blob = ' '.join(search_blob.split())  # Collapse multiple spaces to single space
     
     return search_blob
 
 
-def normalize_event(event: Dict[str, Any]) -> Dict[str, Any]:
+def should_build_search_blob(case_id: Optional[int] = None) -> bool:
+    """
+    Check if search_blob should be built during ingestion
+    
+    search_blob is only read by IOC hunting, which can run long after a
+    file is indexed, so this is a deployment-wide switch rather than a check
+    for IOCs currently on the case.
+    
+    Args:
+        case_id: Optional case ID to check case-specific setting
+    
+    Returns:
+        True if search_blob should be built (default)
+    """
+    try:
+        from config import Config
+        return getattr(Config, 'BUILD_SEARCH_BLOB', True)
+    except Exception:
+        return True
+
+
+class NormalizedFields(NamedTuple):
+    """Values normalize_event_fields() added to an event (None = not added)"""
+    timestamp: Optional[str]
+    computer: Optional[str]
+    event_id: Optional[str]
+    search_blob: Optional[str]
+
+
+def normalize_event(event: Dict[str, Any], build_search_blob: bool = True) -> Dict[str, Any]:
     """
     Add normalized fields to event for consistent search/display
     
+    See normalize_event_fields() for the fields added.
+    
+    Args:
+        event: Original event dictionary
+        build_search_blob: Add search_blob (see should_build_search_blob())
+    
+    Returns:
+        Event dictionary with normalized fields added
+    """
+    normalize_event_fields(event, build_search_blob)
+    return event
+
+
+def normalize_event_fields(event: Dict[str, Any], build_search_blob: bool = True) -> NormalizedFields:
+    """
+    Add normalized fields to event (in place) and return them
+    
+    The fields stay on the event because they are indexed; the returned
+    tuple lets document ID generation use them without dict lookups.
+    
     Adds the following normalized fields:
     - normalized_timestamp: ISO 8601 timestamp
     - normalized_computer: Computer/hostname
@@ -282,31 +516,37 @@ def normalize_event(event: Dict[str, Any]) -> Dict[str, Any]:
     - search_blob: Flattened searchable text (v1.16.24)
     
     Args:
-        event: Original event dictionary
+        event: Original event dictionary (modified in place)
+        build_search_blob: Add search_blob (see should_build_search_blob())
     
     Returns:
-        Event dictionary with normalized fields added
+        NormalizedFields with the values added
     """
+    # System / Event.System are resolved once and shared by all three fields
+    system, wrapped_system = _event_systems(event)
+    
     # Add normalized timestamp
-    normalized_ts = normalize_event_timestamp(event)
+    normalized_ts = _normalize_timestamp(event, system, wrapped_system) or None
     if normalized_ts:
         event['normalized_timestamp'] = normalized_ts
     
     # Add normalized computer name
-    normalized_computer = normalize_event_computer(event)
+    normalized_computer = _normalize_computer(event, system, wrapped_system) or None
     if normalized_computer:
         event['normalized_computer'] = normalized_computer
     
     # Add normalized event ID
-    normalized_id = normalize_event_id(event)
+    normalized_id = _normalize_event_id(event, system, wrapped_system) or None
     if normalized_id:
         event['normalized_event_id'] = normalized_id
     
     # Add search blob for improved IOC/search matching (v1.16.24)
     # Flattens nested data and normalizes line breaks
-    search_blob = create_search_blob(event)
-    if search_blob:
-        event['search_blob'] = search_blob
+    search_blob = None
+    if build_search_blob:
+        search_blob = create_search_blob(event) or None
+        if search_blob:
+            event['search_blob'] = search_blob
     
-    return event
+    return NormalizedFields(normalized_ts, normalized_computer, normalized_id, search_blob)
 
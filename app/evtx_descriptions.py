@@ -8,9 +8,17 @@ from bs4 import BeautifulSoup
 import re
 from datetime import datetime
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.dialects.postgresql import insert
 
 logger = logging.getLogger(__name__)
 
+# Scrapers fetched at the same time (they are network-bound; the GIL is released on socket reads)
+SCRAPER_CONCURRENCY = 4
+
+# Rows per INSERT ... ON CONFLICT statement (keeps bind parameters well under limits)
+UPSERT_BATCH_SIZE = 1000
+
 
 def scrape_ultimate_windows_security():
     """
@@ -34,7 +42,6 @@ def scrape_github_gist():
     Returns: List of dicts with event_id, title, description, category, source_url
     """
     logger.info("[EVTX SCRAPER] Starting GitHub Gist scrape")
-    events = []
     
     # Additional events from GitHub gist patterns
     gist_events = {
@@ -52,15 +59,17 @@ def scrape_github_gist():
     
     source_url = "https://gist.github.com/githubfoam/69eee155e4edafb2e679fb6ac5ea47d0"
     
-    for event_id, data in gist_events.items():
-        events.append({
+    events = [
+        {
             'event_id': event_id,
             'event_source': 'Security',
             'title': data['title'],
             'description': data['title'],
             'category': data['category'],
             'source_url': source_url
-        })
+        }
+        for event_id, data in gist_events.items()
+    ]
     
     logger.info(f"[EVTX SCRAPER] GitHub Gist: Found {len(events)} events")
     return events
@@ -74,7 +83,6 @@ def scrape_infrasos():
     Returns: List of dicts with event_id, title, description, category, source_url
     """
     logger.info("[EVTX SCRAPER] Starting Infrasos scrape")
-    events = []
     
     # Active Directory focused events
     ad_events = {
@@ -99,20 +107,67 @@ def scrape_infrasos():
     
     source_url = "https://infrasos.com/complete-list-of-windows-event-ids-for-active-directory/"
     
-    for event_id, data in ad_events.items():
-        events.append({
+    events = [
+        {
             'event_id': event_id,
             'event_source': 'Security',
             'title': data['title'],
             'description': data['title'],
             'category': data['category'],
             'source_url': source_url
-        })
+        }
+        for event_id, data in ad_events.items()
+    ]
     
     logger.info(f"[EVTX SCRAPER] Infrasos: Found {len(events)} events")
     return events
 
 
+def _run_scraper(scraper_func):
+    try:
+        return scraper_func()
+    except Exception as e:
+        return e
+
+
+def _iter_scraper_results(sources):
+    """
+    Run (name, scraper) pairs in a SCRAPER_CONCURRENCY thread pool
+    
+    Yields (name, events) in source order as soon as each source is ready, so
+    the caller can write one source while later ones are still downloading.
+    events is the exception instead if the scraper raised.
+    """
+    with ThreadPoolExecutor(max_workers=SCRAPER_CONCURRENCY) as executor:
+        futures = [(source_name, executor.submit(_run_scraper, scraper_func))
+                   for source_name, scraper_func in sources]
+        for source_name, future in futures:
+            yield source_name, future.result()
+
+
+def _upsert_descriptions(db, EventDescription, rows):
+    """
+    Insert or update EventDescription rows keyed on (event_id, event_source)
+    
+    Uses PostgreSQL INSERT ... ON CONFLICT DO UPDATE in UPSERT_BATCH_SIZE
+    batches instead of a SELECT plus INSERT/UPDATE per row. Caller commits.
+    """
+    table = EventDescription.__table__
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = insert(table).values(rows[start:start + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            constraint='_event_source_uc',
+            set_={
+                'title': stmt.excluded.title,
+                'description': stmt.excluded.description,
+                'category': stmt.excluded.category,
+                'source_url': stmt.excluded.source_url,
+                'last_updated': stmt.excluded.last_updated
+            }
+        )
+        db.session.execute(stmt)
+
+
 def update_all_descriptions(db, EventDescription):
     """
     Main update function - scrapes all sources and updates database
@@ -149,43 +204,45 @@ def update_all_descriptions(db, EventDescription):
         ('Infrasos', scrape_infrasos)
     ] + enhanced_scrapers
     
-    for source_name, scraper_func in all_sources:
+    # Existing (event_id, event_source) keys, loaded once to split new/updated stats
+    existing_keys = set(
+        db.session.query(EventDescription.event_id, EventDescription.event_source).all()
+    )
+    
+    # Scrapers are independent and network-bound, so fetch them concurrently;
+    # database writes stay on this thread (the session is not thread-safe),
+    # in source order (later sources win)
+    for source_name, events in _iter_scraper_results(all_sources):
         try:
-            events = scraper_func()
+            if isinstance(events, Exception):
+                raise events
             stats['sources'][source_name] = len(events)
             
+            # Last occurrence of a key wins, as with the old row-by-row updates;
+            # one INSERT ... ON CONFLICT cannot touch the same row twice
+            rows = {}
+            now = datetime.utcnow()
             for event_data in events:
                 stats['total_processed'] += 1
-                
-                # Check if event exists
-                existing = db.session.query(EventDescription).filter_by(
-                    event_id=event_data['event_id'],
-                    event_source=event_data['event_source']
-                ).first()
-                
-                if existing:
-                    # Update existing
-                    existing.title = event_data['title']
-                    existing.description = event_data['description']
-                    existing.category = event_data['category']
-                    existing.source_url = event_data['source_url']
-                    existing.last_updated = datetime.utcnow()
-                    stats['updated_events'] += 1
-                else:
-                    # Create new
-                    new_event = EventDescription(
-                        event_id=event_data['event_id'],
-                        event_source=event_data['event_source'],
-                        title=event_data['title'],
-                        description=event_data['description'],
-                        category=event_data['category'],
-                        source_url=event_data['source_url'],
-                        last_updated=datetime.utcnow()
-                    )
-                    db.session.add(new_event)
-                    stats['new_events'] += 1
+                key = (event_data['event_id'], event_data['event_source'])
+                rows[key] = {
+                    'event_id': event_data['event_id'],
+                    'event_source': event_data['event_source'],
+                    'title': event_data['title'],
+                    'description': event_data['description'],
+                    'category': event_data['category'],
+                    'source_url': event_data['source_url'],
+                    'last_updated': now
+                }
+            
+            new_keys = rows.keys() - existing_keys
+            stats['new_events'] += len(new_keys)
+            stats['updated_events'] += len(events) - len(new_keys)
+            
+            _upsert_descriptions(db, EventDescription, list(rows.values()))
             
             db.session.commit()
+            existing_keys.update(new_keys)
             logger.info(f"[EVTX UPDATER] {source_name}: Processed {len(events)} events")
             
         except Exception as e:
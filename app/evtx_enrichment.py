@@ -4,12 +4,269 @@ Provides functions to update event descriptions in OpenSearch without full reind
 Similar to IOC rehunting pattern - modular and reusable
 """
 import logging
+import re
+import time
 from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Seconds between task status polls while an update_by_query runs
+TASK_POLL_INTERVAL = 1.0
 
-def update_event_descriptions_for_case(opensearch_client, db, EventDescription, case_id: int) -> Dict:
+# Seconds an update_by_query task may run before it is cancelled (falls back to bulk updates)
+TASK_TIMEOUT = 30 * 60
+
+# Case indices per indices.refresh call after a global refresh
+REFRESH_INDICES_PER_CALL = 100
+
+# Max distinct Event IDs read back by the per-case terms aggregation
+EVENT_ID_AGG_SIZE = 10000
+
+# Documents per _bulk request when the scripted update falls back to bulk updates
+BULK_UPDATE_CHUNK_SIZE = 1000
+
+# Word tokens of an event_source / Channel / Provider.Name value (lowercased runs of
+# letters, digits and underscores - the standard analyzer's split for these names)
+SOURCE_TOKEN_RE = re.compile(r'\w+')
+
+# Painless script applied to every event with an Event ID. params.descs holds
+# each distinct {t, d, c} (title/description/category) once; params.desc_map
+# maps the Event ID string to a list of {i, s} entries, where i indexes descs
+# and s is the event_source's lowercased word tokens, or null for Security
+# descriptions which match any channel. A non-Security entry applies when any
+# of its tokens is also a token of Channel or Provider.Name - the same test as
+# the old per-description `match` queries on those analyzed fields (e.g. "DNS
+# Server" matches Provider "Microsoft-Windows-DNS-Server-Service"). Events
+# already carrying the chosen description are left alone (noop).
+DESCRIPTION_UPDATE_SCRIPT = """
+    def sys = ctx._source.Event.System;
+    def entries = params.desc_map.get(String.valueOf(sys.EventID));
+    def chosen = null;
+    if (entries != null) {
+        Set tokens = new HashSet();
+        def names = [sys.Channel, sys.Provider instanceof Map ? sys.Provider.Name : null];
+        for (def name : names) {
+            if (name == null) {
+                continue;
+            }
+            String text = String.valueOf(name).toLowerCase();
+            int start = -1;
+            for (int i = 0; i <= text.length(); i++) {
+                boolean word = i < text.length()
+                        && (Character.isLetterOrDigit(text.charAt(i)) || text.charAt(i) == (char) '_');
+                if (word && start < 0) {
+                    start = i;
+                } else if (!word && start >= 0) {
+                    tokens.add(text.substring(start, i));
+                    start = -1;
+                }
+            }
+        }
+        for (def entry : entries) {
+            boolean applies = entry.s == null;
+            if (!applies) {
+                for (def token : entry.s) {
+                    if (tokens.contains(token)) {
+                        applies = true;
+                        break;
+                    }
+                }
+            }
+            if (applies) {
+                chosen = params.descs.get(entry.i);
+            }
+        }
+    }
+    if (chosen == null
+            || (ctx._source.event_title == chosen.t
+                && ctx._source.event_description == chosen.d
+                && ctx._source.event_category == chosen.c)) {
+        ctx.op = 'noop';
+    } else {
+        ctx._source.event_title = chosen.t;
+        ctx._source.event_description = chosen.d;
+        ctx._source.event_category = chosen.c;
+    }
+"""
+
+
+def _source_tokens(value) -> List[str]:
+    """Lowercased word tokens of a source/channel/provider name (see SOURCE_TOKEN_RE)"""
+    return SOURCE_TOKEN_RE.findall(str(value).lower())
+
+
+def _build_script_params(descriptions) -> Dict:
+    """
+    Build DESCRIPTION_UPDATE_SCRIPT params from EventDescription rows
+    
+    Identical (title, description, category) tuples, e.g. legacy and current
+    Event IDs with the same wording, are sent once in 'descs' and referenced
+    by index, which keeps the update_by_query body small.
+    """
+    descs = []
+    desc_index = {}
+    desc_map = {}
+    for desc in descriptions:
+        values = (desc.title, desc.description, desc.category)
+        index = desc_index.get(values)
+        if index is None:
+            index = desc_index[values] = len(descs)
+            descs.append({'t': desc.title, 'd': desc.description, 'c': desc.category})
+        source = desc.event_source
+        desc_map.setdefault(str(desc.event_id), []).append({
+            'i': index,
+            's': _source_tokens(source) if source and source != 'Security' else None
+        })
+    return {'descs': descs, 'desc_map': desc_map}
+
+
+def _run_update_by_query(opensearch_client, index_name: str, body: Dict) -> Dict:
+    """
+    Start update_by_query as a background task and poll until it completes.
+
+    Avoids holding one HTTP request open for the whole run and skips the
+    per-call refresh; callers refresh once when they are done.
+
+    Returns:
+        The task's final response ('updated', 'noops', 'failures', ...)
+    
+    Raises:
+        TimeoutError: the task ran longer than TASK_TIMEOUT (it is cancelled)
+    """
+    response = opensearch_client.update_by_query(
+        index=index_name,
+        body=body,
+        conflicts='proceed',  # Continue on version conflicts
+        wait_for_completion=False,
+        refresh=False
+    )
+
+    task_id = response.get('task')
+    if not task_id:
+        # Older clusters may still answer synchronously
+        return response
+
+    deadline = time.monotonic() + TASK_TIMEOUT
+    while True:
+        status = opensearch_client.tasks.get(task_id=task_id)
+        if status.get('completed'):
+            if 'error' in status:
+                raise RuntimeError(f"update_by_query task {task_id} failed: {status['error']}")
+            return status.get('response', {})
+        if time.monotonic() > deadline:
+            try:
+                opensearch_client.tasks.cancel(task_id=task_id)
+            except Exception as e:
+                logger.warning(f"[EVTX ENRICHMENT] Failed to cancel update_by_query task {task_id}: {e}")
+            raise TimeoutError(f"update_by_query task {task_id} still running after {TASK_TIMEOUT}s, cancelled")
+        time.sleep(TASK_POLL_INTERVAL)
+
+
+def _present_event_ids(opensearch_client, index_name: str) -> Optional[set]:
+    """
+    Distinct Event.System.EventID values in an index (as strings), from one
+    terms aggregation. None when they cannot all be listed (field not
+    aggregatable, or more than EVENT_ID_AGG_SIZE distinct values).
+    """
+    try:
+        response = opensearch_client.search(
+            index=index_name,
+            body={
+                "size": 0,
+                "aggs": {"event_ids": {"terms": {"field": "Event.System.EventID", "size": EVENT_ID_AGG_SIZE}}}
+            }
+        )
+        agg = response['aggregations']['event_ids']
+    except Exception as e:
+        logger.debug(f"[EVTX ENRICHMENT] Event ID aggregation unavailable for {index_name}: {e}")
+        return None
+    
+    if agg.get('sum_other_doc_count'):
+        return None
+    return {str(bucket['key']) for bucket in agg['buckets']}
+
+
+def _case_index_doc_counts(opensearch_client) -> Dict[str, int]:
+    """Doc count of every existing case_* index, from a single _cat/indices call"""
+    rows = opensearch_client.cat.indices(index='case_*', format='json', h='index,docs.count')
+    return {row['index']: int(row.get('docs.count') or 0) for row in rows}
+
+
+def _choose_description(entries: List[Dict], system: Dict) -> Optional[int]:
+    """Python mirror of DESCRIPTION_UPDATE_SCRIPT's entry selection"""
+    provider = system.get('Provider')
+    provider = provider.get('Name') if isinstance(provider, dict) else None
+    tokens = set()
+    for name in (system.get('Channel'), provider):
+        if name is not None:
+            tokens.update(_source_tokens(name))
+    
+    chosen = None
+    for entry in entries:
+        source_tokens = entry['s']
+        if source_tokens is None or not tokens.isdisjoint(source_tokens):
+            chosen = entry['i']
+    return chosen
+
+
+def _apply_descriptions_bulk(opensearch_client, index_name: str, script_params: Dict,
+                             event_ids: Optional[List[str]] = None) -> Dict:
+    """
+    Fallback for the scripted update: scan events with a described Event ID (or
+    only event_ids) and send partial-document updates through _bulk
+    (BULK_UPDATE_CHUNK_SIZE per request)
+    
+    Returns:
+        Dict shaped like an update_by_query response: {'updated': int, 'failures': list}
+    """
+    from opensearchpy.helpers import scan as opensearch_scan, bulk as opensearch_bulk
+    
+    descs = script_params['descs']
+    desc_map = script_params['desc_map']
+    query = {
+        "query": {"terms": {"Event.System.EventID": event_ids if event_ids is not None else list(desc_map)}},
+        "_source": [
+            "Event.System.EventID", "Event.System.Channel", "Event.System.Provider",
+            "event_title", "event_description", "event_category"
+        ]
+    }
+    
+    def actions():
+        for hit in opensearch_scan(opensearch_client, index=index_name, query=query, scroll='5m'):
+            source = hit['_source']
+            system = source.get('Event', {}).get('System', {})
+            entries = desc_map.get(str(system.get('EventID')))
+            chosen = _choose_description(entries, system) if entries else None
+            if chosen is None:
+                continue
+            chosen = descs[chosen]
+            if (source.get('event_title') == chosen['t']
+                    and source.get('event_description') == chosen['d']
+                    and source.get('event_category') == chosen['c']):
+                continue
+            yield {
+                '_op_type': 'update',
+                '_index': index_name,
+                '_id': hit['_id'],
+                'doc': {
+                    'event_title': chosen['t'],
+                    'event_description': chosen['d'],
+                    'event_category': chosen['c']
+                }
+            }
+    
+    success, errors = opensearch_bulk(
+        opensearch_client, actions(), chunk_size=BULK_UPDATE_CHUNK_SIZE,
+        raise_on_error=False, raise_on_exception=False, request_timeout=120
+    )
+    return {'updated': success, 'failures': errors}
+
+
+def update_event_descriptions_for_case(opensearch_client, db, EventDescription, case_id: int,
+                                        descriptions: Optional[List] = None,
+                                        script_params: Optional[Dict] = None,
+                                        refresh: bool = True,
+                                        check_index: bool = True) -> Dict:
     """
     Update event_title, event_description, event_category fields in OpenSearch
     for all events in a case WITHOUT full reindex.
@@ -22,122 +279,115 @@ def update_event_descriptions_for_case(opensearch_client, db, EventDescription,
         db: SQLAlchemy database session
         EventDescription: EventDescription model class
         case_id: Case ID to update events for
+        descriptions: Preloaded EventDescription rows (queried if omitted)
+        script_params: Prebuilt _build_script_params(descriptions) to reuse across cases
+        refresh: Refresh the index when done (False lets a caller refresh many at once)
+        check_index: Check the index exists first (False when the caller already has)
         
     Returns:
         Dict with stats: {
             'status': 'success'|'error',
             'events_updated': int,
-            'descriptions_applied': int,
+            'descriptions_used': int,  # EventDescription rows sent to the update
             'message': str
         }
+    
+    descriptions_used counts the descriptions whose Event ID occurs in the
+    case (all loaded descriptions when the Event IDs cannot be listed). The
+    single scripted update cannot report which of them changed events.
     """
     try:
         index_name = f"case_{case_id}"
         
         # Check if index exists
-        if not opensearch_client.indices.exists(index=index_name):
+        if check_index and not opensearch_client.indices.exists(index=index_name):
             return {
                 'status': 'error',
                 'events_updated': 0,
-                'descriptions_applied': 0,
+                'descriptions_used': 0,
                 'message': f'Index {index_name} does not exist'
             }
         
-        # Get all event descriptions from database
-        descriptions = db.session.query(EventDescription).all()
+        # Get all event descriptions from database (unless the caller preloaded them)
+        if descriptions is None:
+            descriptions = db.session.query(EventDescription).all()
+            script_params = None
         
         if not descriptions:
             return {
                 'status': 'success',
                 'events_updated': 0,
-                'descriptions_applied': 0,
+                'descriptions_used': 0,
                 'message': 'No event descriptions in database'
             }
         
-        # Build a map of event_id -> description data
-        # Key: "event_id|event_source" for matching
-        desc_map = {}
-        for desc in descriptions:
-            key = f"{desc.event_id}|{desc.event_source or 'Security'}"
-            desc_map[key] = {
-                'title': desc.title,
-                'description': desc.description,
-                'category': desc.category
-            }
-        
         logger.info(f"[EVTX ENRICHMENT] Loaded {len(descriptions)} event descriptions from database")
         
-        # Update events in batches by Event ID
-        # This is more efficient than updating all events at once
-        updated_count = 0
-        descriptions_applied = 0
+        # Build a map of event_id -> description entries for the painless script
+        # (once per global refresh - the caller passes it in). Entries keep database
+        # order so the last applicable one wins, matching the old
+        # one-update-per-description behaviour.
+        if script_params is None:
+            script_params = _build_script_params(descriptions)
+        desc_map = script_params['desc_map']
         
-        for desc in descriptions:
-            try:
-                # Build update query for this specific Event ID
-                # We'll use update_by_query with a script
-                query = {
-                    "bool": {
-                        "must": [
-                            {"term": {"Event.System.EventID": desc.event_id}}
-                        ]
-                    }
+        # Only touch events whose Event IDs have a description and occur in this case;
+        # the shared params stay whole, just the query's terms list is narrowed
+        query = {"exists": {"field": "Event.System.EventID"}}
+        event_ids = list(desc_map)
+        descriptions_used = len(descriptions)
+        present_ids = _present_event_ids(opensearch_client, index_name)
+        if present_ids is not None:
+            event_ids = [event_id for event_id in desc_map if event_id in present_ids]
+            if not event_ids:
+                logger.info(f"[EVTX ENRICHMENT] No described Event IDs in case {case_id}, nothing to update")
+                return {
+                    'status': 'success',
+                    'events_updated': 0,
+                    'descriptions_used': 0,
+                    'message': 'No matching Event IDs in case'
                 }
-                
-                # Add event_source filter if available
-                # Check nested structure for Channel field
-                if desc.event_source and desc.event_source != 'Security':
-                    query["bool"]["should"] = [
-                        {"match": {"Event.System.Channel": desc.event_source}},
-                        {"match": {"Event.System.Provider.Name": desc.event_source}}
-                    ]
-                    query["bool"]["minimum_should_match"] = 1
-                
-                # Painless script to update description fields
-                script = {
-                    "source": """
-                        ctx._source.event_title = params.title;
-                        ctx._source.event_description = params.description;
-                        ctx._source.event_category = params.category;
-                    """,
-                    "params": {
-                        "title": desc.title,
-                        "description": desc.description,
-                        "category": desc.category
-                    },
-                    "lang": "painless"
+            descriptions_used = sum(len(desc_map[event_id]) for event_id in event_ids)
+            # Skip events whose Event ID has no description instead of noop-ing them
+            query = {"terms": {"Event.System.EventID": event_ids}}
+        
+        # One update_by_query for the whole index: OpenSearch walks the segments
+        # once and the script looks each event up in the map, instead of one
+        # round-trip (and one refresh) per EventDescription row
+        try:
+            response = _run_update_by_query(
+                opensearch_client,
+                index_name,
+                {
+                    "query": query,
+                    "script": {
+                        "source": DESCRIPTION_UPDATE_SCRIPT,
+                        "params": script_params,
+                        "lang": "painless"
+                    }
                 }
-                
-                # Execute update_by_query
-                response = opensearch_client.update_by_query(
-                    index=index_name,
-                    body={
-                        "query": query,
-                        "script": script
-                    },
-                    conflicts='proceed',  # Continue on version conflicts
-                    wait_for_completion=True,  # Wait for operation to complete
-                    refresh=True  # Refresh index after update
-                )
-                
-                events_updated_for_this_id = response.get('updated', 0)
-                updated_count += events_updated_for_this_id
-                
-                if events_updated_for_this_id > 0:
-                    descriptions_applied += 1
-                    logger.debug(f"[EVTX ENRICHMENT] Updated {events_updated_for_this_id} events for Event ID {desc.event_id}")
-                
-            except Exception as e:
-                logger.warning(f"[EVTX ENRICHMENT] Failed to update Event ID {desc.event_id}: {e}")
-                continue
+            )
+        except Exception as e:
+            # e.g. scripting restricted on the cluster, or the params map too large
+            logger.warning(f"[EVTX ENRICHMENT] Scripted update failed for case {case_id} ({e}), falling back to bulk updates")
+            response = _apply_descriptions_bulk(opensearch_client, index_name, script_params, event_ids)
+        
+        updated_count = response.get('updated', 0)
+        
+        for failure in response.get('failures', [])[:5]:
+            logger.warning(f"[EVTX ENRICHMENT] Update failure in case {case_id}: {failure}")
+        
+        # Refresh once at the end so the new fields are searchable
+        if updated_count and refresh:
+            opensearch_client.indices.refresh(index=index_name)
         
-        logger.info(f"[EVTX ENRICHMENT] ✓ Updated {updated_count} events in case {case_id} ({descriptions_applied} descriptions applied)")
+        logger.info(f"[EVTX ENRICHMENT] ✓ Updated {updated_count} events in case {case_id} ({descriptions_used} descriptions used)")
         
         return {
             'status': 'success',
             'events_updated': updated_count,
-            'descriptions_applied': descriptions_applied,
-            'message': f'Updated {updated_count} events with {descriptions_applied} descriptions'
+            'descriptions_used': descriptions_used,
+            'message': f'Updated {updated_count} events using {descriptions_used} matching descriptions'
         }
         
     except Exception as e:
@@ -145,7 +395,7 @@ def update_event_descriptions_for_case(opensearch_client, db, EventDescription,
         return {
             'status': 'error',
             'events_updated': 0,
-            'descriptions_applied': 0,
+            'descriptions_used': 0,
             'message': str(e)
         }
 
@@ -165,7 +415,7 @@ def update_event_descriptions_global(opensearch_client, db, EventDescription, Ca
             'status': 'success'|'error',
             'cases_processed': int,
             'total_events_updated': int,
-            'total_descriptions_applied': int,
+            'total_descriptions_used': int,  # Sum of per-case descriptions_used
             'message': str
         }
     """
@@ -178,25 +428,53 @@ def update_event_descriptions_global(opensearch_client, db, EventDescription, Ca
                 'status': 'success',
                 'cases_processed': 0,
                 'total_events_updated': 0,
-                'total_descriptions_applied': 0,
+                'total_descriptions_used': 0,
                 'message': 'No cases found'
             }
         
         total_events_updated = 0
-        total_descriptions_applied = 0
+        total_descriptions_used = 0
         cases_processed = 0
         
         logger.info(f"[EVTX ENRICHMENT GLOBAL] Starting global update for {len(cases)} cases")
         
+        # Same descriptions for every case: query and build the script map once
+        descriptions = db.session.query(EventDescription).all()
+        script_params = _build_script_params(descriptions)
+        
+        # Indices with updates, refreshed together in one call at the end
+        updated_indices = []
+        
+        # One _cat/indices call instead of an exists check per case: cases
+        # without an index are skipped, empty ones count as done with 0 updates
+        doc_counts = _case_index_doc_counts(opensearch_client)
+        
         for case in cases:
+            index_name = f"case_{case.id}"
+            if index_name not in doc_counts:
+                continue
+            if not doc_counts[index_name]:
+                cases_processed += 1
+                continue
+            
             result = update_event_descriptions_for_case(
-                opensearch_client, db, EventDescription, case.id
+                opensearch_client, db, EventDescription, case.id,
+                descriptions=descriptions, script_params=script_params, refresh=False,
+                check_index=False
             )
             
             if result['status'] == 'success':
                 total_events_updated += result['events_updated']
-                total_descriptions_applied += result['descriptions_applied']
+                total_descriptions_used += result['descriptions_used']
                 cases_processed += 1
+                if result['events_updated']:
+                    updated_indices.append(index_name)
+        
+        # Chunked to keep the request line short on installs with many cases
+        for start in range(0, len(updated_indices), REFRESH_INDICES_PER_CALL):
+            opensearch_client.indices.refresh(
+                index=','.join(updated_indices[start:start + REFRESH_INDICES_PER_CALL])
+            )
         
         logger.info(f"[EVTX ENRICHMENT GLOBAL] ✓ Processed {cases_processed} cases, updated {total_events_updated} events")
         
@@ -204,7 +482,7 @@ def update_event_descriptions_global(opensearch_client, db, EventDescription, Ca
             'status': 'success',
             'cases_processed': cases_processed,
             'total_events_updated': total_events_updated,
-            'total_descriptions_applied': total_descriptions_applied,
+            'total_descriptions_used': total_descriptions_used,
             'message': f'Processed {cases_processed} cases, updated {total_events_updated} events'
         }
         
@@ -214,7 +492,7 @@ def update_event_descriptions_global(opensearch_client, db, EventDescription, Ca
             'status': 'error',
             'cases_processed': 0,
             'total_events_updated': 0,
-            'total_descriptions_applied': 0,
+            'total_descriptions_used': 0,
             'message': str(e)
         }
 
@@ -9,13 +9,247 @@ Enhanced to scrape all pages and all sources:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
 from bs4 import BeautifulSoup
 import re
 import logging
+from functools import lru_cache
 import time
+import hashlib
+import json
+import os
+from pathlib import Path
+
+try:
+    from lxml import etree as lxml_etree
+    HTML_PARSER = 'lxml'  # C parser backend for BeautifulSoup
+except ImportError:
+    lxml_etree = None
+    HTML_PARSER = 'html.parser'
 
 logger = logging.getLogger(__name__)
 
+# Links to event detail pages, e.g. <a href="event.aspx?eventid=4624">4624</a>
+EVENT_LINK_RE = re.compile(r'event\.aspx\?eventid=\d+')
+EVENT_ID_RE = re.compile(r'eventid=(\d+)')
+
+# Characters of page text fed to the incremental HTML parser per step
+PARSE_CHUNK_SIZE = 64 * 1024
+
+# Source column keyword -> event_source/category, checked in priority order
+# ("Windows Sysmon" is Sysmon); anything unmatched is Security
+SOURCE_KEYWORDS = (
+    ('Sysmon', 'Sysmon'),
+    ('SharePoint', 'SharePoint'),
+    ('SQL', 'SQL Server'),
+    ('Exchange', 'Exchange'),
+    ('Windows', 'Security'),
+)
+
+# Shared keep-alive session for all description scrapers: detail and per-source
+# pages on the same host reuse pooled TCP/TLS connections instead of a fresh
+# handshake per requests.get()
+SCRAPER_SESSION = requests.Session()
+# Some sites reject the default python-requests agent; send a browser-compatible one
+SCRAPER_SESSION.headers['User-Agent'] = 'Mozilla/5.0 (compatible; CaseScope EVTX description updater)'
+# Ask for compressed pages explicitly, limited to the encodings urllib3 can
+# decode here (gzip/deflate, plus br/zstd only when their packages are installed)
+SCRAPER_SESSION.headers['Accept-Encoding'] = ACCEPT_ENCODING
+_scraper_adapter = HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504))
+)
+SCRAPER_SESSION.mount('http://', _scraper_adapter)
+SCRAPER_SESSION.mount('https://', _scraper_adapter)
+
+# Pages are cached here with their ETag/Last-Modified validators (and the events
+# parsed from them) so unchanged pages come back as 304s and are not re-parsed
+SCRAPER_CACHE_DIR = Path('/opt/casescope/staging/.evtx-scraper-cache')
+
+
+def _cache_path(url):
+    return SCRAPER_CACHE_DIR / (hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+
+def _load_cache_entry(url):
+    try:
+        with open(_cache_path(url), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache_entry(url, entry):
+    path = _cache_path(url)
+    try:
+        SCRAPER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug(f"[REAL SCRAPER] Could not write cache for {url}: {e}")
+
+
+def fetch_page_cached(url, timeout, max_age=None):
+    """
+    Conditional GET backed by SCRAPER_CACHE_DIR
+    
+    Sends If-None-Match / If-Modified-Since from the cached copy. On 304, or
+    when a 200 body hashes the same as the cached one, the cached entry is
+    reused, including any 'events' a caller stored for it.
+    
+    With max_age (seconds), a copy fetched or revalidated within that window
+    is returned without any request, and a 404 is remembered for the same
+    window so dead pages are not requested again on every run.
+    
+    Returns:
+        dict: cache entry with 'text', 'sha256' (of the body bytes) and, if the page is unchanged
+        since it was last parsed, 'events'
+    
+    Raises:
+        requests.HTTPError: on error status (including a remembered 404)
+    """
+    cached = _load_cache_entry(url)
+    now = time.time()
+    if max_age and now - cached.get('fetched_at', 0) < max_age:
+        if cached.get('not_found'):
+            raise requests.HTTPError(f"404 Client Error: Not Found (cached) for url: {url}")
+        if cached.get('text') is not None:
+            return cached
+    
+    headers = {}
+    if cached.get('text') is not None:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    
+    response = SCRAPER_SESSION.get(url, timeout=timeout, headers=headers)
+    if response.status_code == 304 and headers:
+        logger.info(f"[REAL SCRAPER] {url} not modified (304), using cached copy")
+        if max_age:
+            cached['fetched_at'] = now
+            _save_cache_entry(url, cached)
+        return cached
+    if response.status_code == 404 and max_age:
+        _save_cache_entry(url, {'not_found': True, 'fetched_at': now})
+    response.raise_for_status()
+    
+    # Hash the raw (already decompressed) body, so an unchanged page is never
+    # decoded to text again; the charset is included as it decides the text
+    digest = hashlib.sha256(response.content)
+    digest.update((response.encoding or '').encode('ascii', 'replace'))
+    digest = digest.hexdigest()
+    if digest == cached.get('sha256'):
+        entry = cached
+    else:
+        entry = {'text': response.text, 'sha256': digest}
+    entry['etag'] = response.headers.get('ETag')
+    entry['last_modified'] = response.headers.get('Last-Modified')
+    entry['fetched_at'] = now
+    _save_cache_entry(url, entry)
+    return entry
+
+
+def store_parsed_events(url, entry, events):
+    """Remember the events parsed from a fetch_page_cached() entry"""
+    entry['events'] = events
+    _save_cache_entry(url, entry)
+
+
+def lxml_text(element):
+    """lxml counterpart of BeautifulSoup's get_text(strip=True)"""
+    return ''.join(text.strip() for text in element.itertext())
+
+
+def _iter_table_row_events(row_events):
+    """
+    Event rows from finished outermost <tr> elements of an HTMLPullParser
+    
+    Rows nested in another row are left for their outermost row, which still
+    sees all of its cells. Each outermost row is cleared, and earlier ones
+    removed, once read, so only about one row of the tree is kept in memory.
+    """
+    for _, table_row in row_events:
+        if next(table_row.iterancestors('tr'), None) is not None:
+            continue
+        
+        row = row_values = None
+        for link in table_row.iter('a'):
+            href = link.get('href', '')
+            if not EVENT_LINK_RE.search(href):
+                continue
+            link_row = next(link.iterancestors('tr'))
+            if link_row is not row:
+                # Several links can share a row; read its cells only once
+                row = link_row
+                cells = list(row.iter('td'))
+                if len(cells) < 3:
+                    row_values = None
+                else:
+                    desc_link = next(cells[2].iter('a'), None)
+                    row_values = (
+                        lxml_text(cells[0]),
+                        lxml_text(desc_link if desc_link is not None else cells[2])
+                    )
+            if row_values is not None:
+                yield (href,) + row_values
+        
+        table_row.clear(keep_tail=True)
+        parent = table_row.getparent()
+        if parent is not None:
+            while table_row.getprevious() is not None:
+                del parent[0]
+
+
+def _iter_event_rows(html):
+    """
+    Yield (href, source_text, description) for each event link on the page
+    
+    source_text is the first cell of the link's table row and description the
+    third cell (its first link's text if it has one). Links outside a row with
+    at least three cells are skipped. With lxml the page is parsed
+    incrementally and each table row is read and discarded as soon as it is
+    complete, instead of building the whole multi-MB page tree first;
+    BeautifulSoup is the fallback when lxml is not installed.
+    """
+    if lxml_etree is not None:
+        parser = lxml_etree.HTMLPullParser(events=('end',), tag='tr')
+        for start in range(0, len(html), PARSE_CHUNK_SIZE):
+            parser.feed(html[start:start + PARSE_CHUNK_SIZE])
+            yield from _iter_table_row_events(parser.read_events())
+        parser.close()
+        yield from _iter_table_row_events(parser.read_events())
+        return
+    
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for link in soup.find_all('a', href=EVENT_LINK_RE):
+        row = link.find_parent('tr')
+        if not row:
+            continue
+        cells = row.find_all('td')
+        if len(cells) < 3:
+            continue
+        desc_link = cells[2].find('a')
+        yield (
+            link.get('href', ''),
+            cells[0].get_text(strip=True),
+            (desc_link or cells[2]).get_text(strip=True)
+        )
+
+
+@lru_cache(maxsize=256)
+def _classify_source(source_text):
+    """Map the page's source column text to the event_source (also used as category)"""
+    for keyword, event_source in SOURCE_KEYWORDS:
+        if keyword in source_text:
+            return event_source
+    return 'Security'
+
 
 def scrape_ultimate_windows_security_real():
     """
@@ -39,71 +273,42 @@ def scrape_ultimate_windows_security_real():
     
     try:
         logger.info(f"[REAL SCRAPER] Fetching {url}")
-        response = requests.get(url, timeout=60)  # Increased timeout for large page
-        response.raise_for_status()
+        page = fetch_page_cached(url, timeout=60)  # Increased timeout for large page
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Page unchanged since the last parse: reuse those events
+        if page.get('events') is not None:
+            logger.info(f"[REAL SCRAPER] ✓ Page unchanged, reusing {len(page['events'])} cached events")
+            return page['events']
         
-        # Find all links that point to event detail pages
-        # Format: <a href="event.aspx?eventid=4624">4624</a>
-        event_links = soup.find_all('a', href=re.compile(r'event\.aspx\?eventid=\d+'))
-        
-        logger.info(f"[REAL SCRAPER] Found {len(event_links)} event links")
-        
-        # Process each event link
-        for link in event_links:
+        # Walk the event links and their table rows in a single pass
+        # Cells: 0 = Source (Windows, Sysmon, SharePoint, SQL, Exchange), 2 = Description
+        # Deduplicate by (event_id, event_source) as rows are read (keep first occurrence)
+        seen = set()
+        duplicates = 0
+        event_rows = 0
+        for href, source_text, description in _iter_event_rows(page['text']):
+            event_rows += 1
             try:
                 # Extract event ID from href
-                href = link.get('href', '')
-                match = re.search(r'eventid=(\d+)', href)
+                match = EVENT_ID_RE.search(href)
                 if not match:
                     continue
                 
                 event_id = int(match.group(1))
                 
-                # Get the parent row to extract description
-                row = link.find_parent('tr')
-                if not row:
-                    continue
-                
-                cells = row.find_all('td')
-                if len(cells) < 3:
-                    continue
-                
-                # Cell 0: Source (Windows, Sysmon, SharePoint, SQL, Exchange)
-                source_text = cells[0].get_text(strip=True)
-                
-                # Map source text to event_source
-                event_source = 'Security'  # Default
-                category = 'Security'  # Default
-                
-                if 'Sysmon' in source_text:
-                    event_source = 'Sysmon'
-                    category = 'Sysmon'
-                elif 'SharePoint' in source_text:
-                    event_source = 'SharePoint'
-                    category = 'SharePoint'
-                elif 'SQL' in source_text:
-                    event_source = 'SQL Server'
-                    category = 'SQL Server'
-                elif 'Exchange' in source_text:
-                    event_source = 'Exchange'
-                    category = 'Exchange'
-                elif 'Windows' in source_text:
-                    event_source = 'Security'
-                    category = 'Security'
-                
-                # Cell 2: Description (may be a link or plain text)
-                desc_link = cells[2].find('a')
-                if desc_link:
-                    description = desc_link.get_text(strip=True)
-                else:
-                    description = cells[2].get_text(strip=True)
+                # Map source text to event_source (the page has only a handful
+                # of distinct source values, so this is a cache hit per row)
+                event_source = category = _classify_source(source_text)
                 
                 # Clean up description
                 description = description.strip()
                 
                 if event_id and description:
+                    key = (event_id, event_source)
+                    if key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(key)
                     events.append({
                         'event_id': event_id,
                         'event_source': event_source,
@@ -121,20 +326,13 @@ def scrape_ultimate_windows_security_real():
                 logger.debug(f"[REAL SCRAPER] Error parsing event link: {e}")
                 continue
         
-        # Deduplicate events by event_id (keep first occurrence)
-        seen = set()
-        unique_events = []
-        for event in events:
-            key = (event['event_id'], event['event_source'])
-            if key not in seen:
-                seen.add(key)
-                unique_events.append(event)
+        logger.info(f"[REAL SCRAPER] Found {event_rows} event links")
         
-        logger.info(f"[REAL SCRAPER] ✓ Successfully scraped {len(unique_events)} unique events (removed {len(events) - len(unique_events)} duplicates)")
+        logger.info(f"[REAL SCRAPER] ✓ Successfully scraped {len(events)} unique events (removed {duplicates} duplicates)")
         
         # Log breakdown by source
         sources = {}
-        for event in unique_events:
+        for event in events:
             src = event['event_source']
             sources[src] = sources.get(src, 0) + 1
         
@@ -142,7 +340,8 @@ def scrape_ultimate_windows_security_real():
         for src, count in sources.items():
             logger.info(f"[REAL SCRAPER]   - {src}: {count} events")
         
-        return unique_events
+        store_parsed_events(url, page, events)
+        return events
     
     except Exception as e:
         logger.error(f"[REAL SCRAPER] Error fetching page: {e}", exc_info=True)
@@ -157,10 +356,9 @@ def get_detailed_event_info(event_id):
     url = f"https://www.ultimatewindowssecurity.com/securitylog/encyclopedia/event.aspx?eventid={event_id}"
     
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        page = fetch_page_cached(url, timeout=10)
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(page['text'], HTML_PARSER)
         
         # Extract category, detailed description from the detail page
         # This is more complex and can be added if needed
@@ -3,16 +3,50 @@ CSV Export Utilities
 Handles CSV generation for event exports
 """
 
-import csv
-import io
 import json
+import re
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Dict, Any, Iterable, Iterator
 
+try:
+    import orjson
+except ImportError:  # Optional speedup - fall back to stdlib json
+    orjson = None
 
-def generate_events_csv(events: List[Dict[str, Any]]) -> str:
+
+# Rows written before each chunk is handed to the response (bounds the buffer)
+CSV_STREAM_BATCH_ROWS = 10000
+
+CSV_HEADER = 'Event ID,Date/Time,Computer Name,Source File,Raw Data\r\n'
+
+# Characters that make csv.writer (excel dialect, QUOTE_MINIMAL) quote a field
+CSV_QUOTE_RE = re.compile(r'[,"\r\n]')
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize an event for the Raw Data column (orjson when available)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str).decode('utf-8')
+        except TypeError:
+            pass  # e.g. non-string keys or out-of-range ints - use stdlib below
+    return json.dumps(obj, default=str)
+
+
+def _csv_field(value: Any) -> str:
+    """Format one field exactly as csv.writer would (excel dialect)"""
+    if value is None:
+        return ''
+    if value.__class__ is not str:
+        value = str(value)
+    if CSV_QUOTE_RE.search(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def stream_events_csv(events: Iterable[Dict[str, Any]]) -> Iterator[str]:
     """
-    Generate CSV from event list with FULL event data
+    Generate CSV from events with FULL event data, as a stream of text chunks
     
     Columns: Event ID, Date/Time, Computer Name, Source File, Raw Data (FULL JSON)
     
@@ -22,15 +56,29 @@ def generate_events_csv(events: List[Dict[str, Any]]) -> str:
     - Event.EventData.ShareName
     - Event.EventData.ObjectName
     - All other EventData fields for forensic analysis
+    
+    Rows are buffered and yielded every CSV_STREAM_BATCH_ROWS rows, so the
+    whole CSV is never held in memory (pass to a streaming Flask Response).
+    
+    Lines are formatted directly for this fixed 5-column schema instead of
+    through csv.writer (output is identical). Computer Name and Source File
+    repeat across most rows, so their formatted form is memoized per export.
     """
-    output = io.StringIO()
-    writer = csv.writer(output)
+    lines = [CSV_HEADER]
+    
+    # Formatted Computer Name / Source File values (few distinct per export)
+    formatted_fields = {}
     
-    # Write header
-    writer.writerow(['Event ID', 'Date/Time', 'Computer Name', 'Source File', 'Raw Data'])
+    def format_repeated(value):
+        if value.__class__ is not str:
+            return _csv_field(value)
+        field = formatted_fields.get(value)
+        if field is None:
+            field = formatted_fields[value] = _csv_field(value)
+        return field
     
     # Write data rows
-    for event in events:
+    for row_count, event in enumerate(events, 1):
         # Extract normalized fields (added during ingestion)
         event_id = event.get('normalized_event_id', 'N/A')
         timestamp = event.get('normalized_timestamp', '')
@@ -45,15 +93,21 @@ def generate_events_csv(events: List[Dict[str, Any]]) -> str:
         
         # Convert ENTIRE event to JSON for raw data column
         # This includes Event.EventData with all fields (TargetUserName, ShareName, etc.)
-        raw_data = json.dumps(event, default=str)
+        raw_data = _json_dumps(event)
         
-        writer.writerow([
-            event_id,
-            timestamp,
-            computer_name,
-            source_file,
-            raw_data
-        ])
-    
-    return output.getvalue()
+        lines.append(
+            f'{_csv_field(event_id)},{_csv_field(timestamp)},{format_repeated(computer_name)},'
+            f'{format_repeated(source_file)},{_csv_field(raw_data)}\r\n'
+        )
+        
+        if row_count % CSV_STREAM_BATCH_ROWS == 0:
+            yield ''.join(lines)
+            lines.clear()
+    
+    yield ''.join(lines)
+
+
+def generate_events_csv(events: Iterable[Dict[str, Any]]) -> str:
+    """Generate the whole events CSV as one string (see stream_events_csv)"""
+    return ''.join(stream_events_csv(events))
 
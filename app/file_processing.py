@@ -21,8 +21,8 @@ import os
 import json
 import subprocess
 import tempfile
-import hashlib
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -429,7 +429,8 @@ def extract_forensic_fields(event_data, user_data, event_id):
 # ============================================================================
 
 def duplicate_check(db, CaseFile, SkippedFile, case_id: int, filename: str, 
-                   file_path: str, upload_type: str = 'http', exclude_file_id: int = None) -> dict:
+                   file_path: str, upload_type: str = 'http', exclude_file_id: int = None,
+                   file_hash: str = None, commit: bool = True) -> dict:
     """
     Check if file already exists in case (hash + filename match).
     
@@ -447,6 +448,11 @@ def duplicate_check(db, CaseFile, SkippedFile, case_id: int, filename: str,
         filename: Original filename (e.g., "DESKTOP-123_Security.evtx")
         file_path: Full path to file on disk
         upload_type: 'http' or 'local'
+        exclude_file_id: CaseFile ID of this file (not matched against itself)
+        file_hash: SHA256 already computed for this file (e.g. by the upload
+                   pipeline); the file is only hashed here when not given
+        commit: Commit the SkippedFile row; pass False to leave it in the
+                session for the caller's next commit
     
     Returns:
         dict: {
@@ -461,8 +467,14 @@ def duplicate_check(db, CaseFile, SkippedFile, case_id: int, filename: str,
     logger.info(f"[DUPLICATE CHECK] Case: {case_id}, File: {filename}")
     logger.info("="*80)
     
-    # Calculate file hash and size
-    file_size = os.path.getsize(file_path)
+    # Calculate SHA256 hash and size (unless the caller already has the hash -
+    # hashing re-reads the whole file); one open + fstat covers both
+    if file_hash is None:
+        from utils import hash_file_with_size
+        file_hash, file_size = hash_file_with_size(file_path)
+    else:
+        logger.info("[DUPLICATE CHECK] Using SHA256 computed at upload")
+        file_size = os.path.getsize(file_path)
     
     # Check for 0-byte files
     if file_size == 0:
@@ -479,7 +491,8 @@ def duplicate_check(db, CaseFile, SkippedFile, case_id: int, filename: str,
             upload_type=upload_type
         )
         db.session.add(skipped)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         
         return {
             'status': 'skip',
@@ -488,18 +501,12 @@ def duplicate_check(db, CaseFile, SkippedFile, case_id: int, filename: str,
             'file_size': 0
         }
     
-    # Calculate SHA256 hash
-    sha256_hash = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
-            sha256_hash.update(chunk)
-    file_hash = sha256_hash.hexdigest()
-    
     logger.info(f"[DUPLICATE CHECK] File hash: {file_hash[:16]}...")
     logger.info(f"[DUPLICATE CHECK] File size: {file_size:,} bytes")
     
-    # Check for existing file with same hash + filename
-    query = db.session.query(CaseFile).filter_by(
+    # Check for existing file with same hash + filename (only the id is needed;
+    # ix_case_file_dedup INCLUDEs it, so this can be an index-only scan)
+    query = db.session.query(CaseFile.id).filter_by(
         case_id=case_id,
         original_filename=filename,
         file_hash=file_hash,
@@ -526,7 +533,8 @@ def duplicate_check(db, CaseFile, SkippedFile, case_id: int, filename: str,
             upload_type=upload_type
         )
         db.session.add(skipped)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         
         return {
             'status': 'skip',
@@ -548,6 +556,63 @@ def duplicate_check(db, CaseFile, SkippedFile, case_id: int, filename: str,
 # FUNCTION 2: INDEX FILE
 # ============================================================================
 
+# ============================================================================
+# BULK INDEXING PIPELINE
+# ============================================================================
+
+class BulkIndexPipeline:
+    """
+    Send OpenSearch bulk batches from a background thread.
+    
+    Parsing and normalizing events is CPU-bound Python that holds the GIL;
+    the bulk request is network I/O that releases it. Sending batch N while
+    batch N+1 is built overlaps the two. At most one batch is in flight, so
+    memory stays bounded at two batches.
+    """
+    
+    def __init__(self, opensearch_client):
+        from concurrent.futures import ThreadPoolExecutor
+        self.opensearch_client = opensearch_client
+        self.indexed_count = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bulk-index')
+        self._pending = None
+    
+    def submit(self, batch, final=False):
+        """Queue a batch (caller must not reuse the list); waits for the previous one"""
+        self._wait()
+        self._pending = self._executor.submit(self._send, batch, final)
+    
+    def close(self) -> int:
+        """Wait for the last batch, stop the thread and return the total indexed count (idempotent)"""
+        self._wait()
+        self._executor.shutdown(wait=True)
+        return self.indexed_count
+    
+    def _wait(self):
+        if self._pending is not None:
+            self.indexed_count += self._pending.result()
+            self._pending = None
+    
+    def _send(self, batch, final) -> int:
+        from opensearchpy.helpers import bulk as opensearch_bulk
+        batch_label = 'final batch' if final else 'batch'
+        try:
+            success, errors = opensearch_bulk(self.opensearch_client, batch, raise_on_error=False)
+            if errors:
+                logger.warning(f"[INDEX FILE] {len(errors)} events failed to index in {batch_label}")
+                # Log first error for debugging (v1.13.4)
+                first_error = errors[0]
+                if isinstance(first_error, dict):
+                    error_detail = first_error.get('index', {}).get('error', {})
+                    error_type = error_detail.get('type', 'unknown')
+                    error_reason = error_detail.get('reason', 'unknown')
+                    logger.error(f"[INDEX FILE] First bulk error: {error_type} - {error_reason}")
+            return success
+        except Exception as e:
+            logger.error(f"[INDEX FILE] {'Final bulk' if final else 'Bulk'} index error: {e}")
+            return 0
+
+
 def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: str,
               file_path: str, file_hash: str, file_size: int, uploader_id: int,
               upload_type: str = 'http', file_id: int = None, celery_task=None, 
@@ -589,13 +654,19 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
     from tasks import commit_with_retry
     
     # Check if event deduplication is enabled
-    from event_deduplication import should_deduplicate_events, generate_event_document_id
+    from event_deduplication import should_deduplicate_events, make_id_generator, generate_event_document_ids
     deduplicate_enabled = should_deduplicate_events(case_id)
     if deduplicate_enabled:
         logger.info("[INDEX FILE] Event deduplication ENABLED - using deterministic document IDs")
     else:
         logger.info("[INDEX FILE] Event deduplication DISABLED - using auto-generated document IDs")
     
+    # Check if search_blob (IOC phrase-matching text) should be built
+    from event_normalization import should_build_search_blob
+    build_search_blob = should_build_search_blob(case_id)
+    if not build_search_blob:
+        logger.info("[INDEX FILE] search_blob DISABLED - IOC phrase matching falls back to raw fields")
+    
     logger.info("="*80)
     logger.info("[INDEX FILE] Starting file indexing")
     logger.info(f"[INDEX FILE] File: {filename}")
@@ -723,6 +794,7 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
     
     commit_with_retry(db.session, logger_instance=logger)
     
+    bulk_pipeline = None  # Created once parsing starts; always closed below
     try:
         # STEP 1: Convert EVTX to JSONL (if needed) or prepare CSV
         if is_evtx:
@@ -731,11 +803,14 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
             json_path = json_file.name
             json_file.close()
             
-            # Run evtx_dump
+            # Run evtx_dump, streaming its JSONL straight into the temp file
+            # (capturing stdout would hold the whole conversion in memory)
             cmd = ['/opt/casescope/bin/evtx_dump', '-o', 'jsonl', file_path]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            with open(json_path, 'wb') as f:
+                result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, text=True, timeout=600)
             
             if result.returncode != 0:
+                os.remove(json_path)
                 error_msg = f'evtx_dump failed: {result.stderr[:100]}'
                 logger.error(f"[INDEX FILE] {error_msg}")
                 case_file.indexing_status = 'Failed'
@@ -749,10 +824,6 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
                     'index_name': index_name
                 }
             
-            # Write JSONL to file
-            with open(json_path, 'w') as f:
-                f.write(result.stdout)
-            
             logger.info(f"[INDEX FILE] ✓ EVTX converted to JSONL: {json_path}")
         elif is_csv:
             # CSV files will be processed directly (no conversion needed)
@@ -836,11 +907,14 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
                     'index_name': None
                 }
         
-        from opensearchpy.helpers import bulk as opensearch_bulk
-        
         event_count = 0  # Events parsed from file
         indexed_count = 0  # Events successfully indexed to OpenSearch
         bulk_data = []
+        bulk_pipeline = BulkIndexPipeline(opensearch_client)
+        
+        # Document ID generator specialised for this file's source type (deduplication)
+        source_type = 'CSV' if is_csv else 'IIS' if is_iis else 'EVTX' if is_evtx else 'JSON'
+        generate_doc_id = make_id_generator(case_id, source_type, use_dedup=deduplicate_enabled)
         
         # Process CSV files
         if is_csv:
@@ -897,8 +971,8 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
                     event['file_id'] = file_id
                     
                     # Normalize event fields for consistent search
-                    from event_normalization import normalize_event
-                    event = normalize_event(event)
+                    from event_normalization import normalize_event_fields
+                    normalized_fields = normalize_event_fields(event, build_search_blob)
                     
                     # Add deterministic document ID for deduplication if enabled
                     bulk_doc = {
@@ -906,7 +980,7 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
                         '_source': event
                     }
                     if deduplicate_enabled:
-                        doc_id = generate_event_document_id(case_id, event)
+                        doc_id = generate_doc_id(event, normalized_fields)
                         bulk_doc['_id'] = doc_id
                     
                     bulk_data.append(bulk_doc)
@@ -915,21 +989,7 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
                     
                     # Bulk index every 1000 events
                     if len(bulk_data) >= 1000:
-                        try:
-                            success, errors = opensearch_bulk(opensearch_client, bulk_data, raise_on_error=False)
-                            indexed_count += success
-                            if errors:
-                                logger.warning(f"[INDEX FILE] {len(errors)} events failed to index in batch")
-                                # Log first error for debugging (v1.13.4)
-                                if len(errors) > 0:
-                                    first_error = errors[0]
-                                    if isinstance(first_error, dict):
-                                        error_detail = first_error.get('index', {}).get('error', {})
-                                        error_type = error_detail.get('type', 'unknown')
-                                        error_reason = error_detail.get('reason', 'unknown')
-                                        logger.error(f"[INDEX FILE] First bulk error: {error_type} - {error_reason}")
-                        except Exception as e:
-                            logger.error(f"[INDEX FILE] Bulk index error: {e}")
+                        bulk_pipeline.submit(bulk_data)  # Sent in the background while parsing continues
                         bulk_data = []
                         
                         # Update progress
@@ -957,40 +1017,28 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
             if not parsed_events:
                 logger.warning(f"[INDEX FILE] No events parsed from IIS log")
             
+            # Normalize event fields for consistent search
+            from event_normalization import normalize_event
+            parsed_events = [normalize_event(event, build_search_blob) for event in parsed_events]
+            
+            # Deterministic document IDs for deduplication, hashed as one batch
+            doc_ids = generate_event_document_ids(case_id, parsed_events, 'IIS') if deduplicate_enabled else None
+            
             # Bulk index IIS events
-            for event in parsed_events:
-                # Normalize event fields for consistent search
-                from event_normalization import normalize_event
-                event = normalize_event(event)
-                
-                # Add deterministic document ID for deduplication if enabled
+            for event_index, event in enumerate(parsed_events):
                 bulk_doc = {
                     '_index': index_name,
                     '_source': event
                 }
-                if deduplicate_enabled:
-                    doc_id = generate_event_document_id(case_id, event)
-                    bulk_doc['_id'] = doc_id
+                if doc_ids is not None:
+                    bulk_doc['_id'] = doc_ids[event_index]
                 
                 bulk_data.append(bulk_doc)
                 event_count += 1
                 
                 # Bulk index every 1000 events
                 if len(bulk_data) >= 1000:
-                    try:
-                        success, errors = opensearch_bulk(opensearch_client, bulk_data, raise_on_error=False)
-                        indexed_count += success
-                        if errors:
-                            logger.warning(f"[INDEX FILE] {len(errors)} events failed to index in batch")
-                            if len(errors) > 0:
-                                first_error = errors[0]
-                                if isinstance(first_error, dict):
-                                    error_detail = first_error.get('index', {}).get('error', {})
-                                    error_type = error_detail.get('type', 'unknown')
-                                    error_reason = error_detail.get('reason', 'unknown')
-                                    logger.error(f"[INDEX FILE] First bulk error: {error_type} - {error_reason}")
-                    except Exception as e:
-                        logger.error(f"[INDEX FILE] Bulk index error: {e}")
+                    bulk_pipeline.submit(bulk_data)  # Sent in the background while parsing continues
                     bulk_data = []
                     
                     # Update progress
@@ -1035,8 +1083,8 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
                             event['source_file_type'] = 'EDR' if is_edr else 'JSON'
                         
                         # Normalize event fields (timestamp, computer, event_id) for consistent search
-                        from event_normalization import normalize_event
-                        event = normalize_event(event)
+                        from event_normalization import normalize_event_fields
+                        normalized_fields = normalize_event_fields(event, build_search_blob)
                         
                         # Add event description if available (Phase 3: Integration)
                         if use_event_descriptions:
@@ -1094,7 +1142,7 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
                             '_source': event
                         }
                         if deduplicate_enabled:
-                            doc_id = generate_event_document_id(case_id, event)
+                            doc_id = generate_doc_id(event, normalized_fields)
                             bulk_doc['_id'] = doc_id
                         
                         bulk_data.append(bulk_doc)
@@ -1103,21 +1151,7 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
                         
                         # Bulk index every 1000 events
                         if len(bulk_data) >= 1000:
-                            try:
-                                success, errors = opensearch_bulk(opensearch_client, bulk_data, raise_on_error=False)
-                                indexed_count += success
-                                if errors:
-                                    logger.warning(f"[INDEX FILE] {len(errors)} events failed to index in batch")
-                                    # Log first error for debugging (v1.13.4)
-                                    if len(errors) > 0:
-                                        first_error = errors[0]
-                                        if isinstance(first_error, dict):
-                                            error_detail = first_error.get('index', {}).get('error', {})
-                                            error_type = error_detail.get('type', 'unknown')
-                                            error_reason = error_detail.get('reason', 'unknown')
-                                            logger.error(f"[INDEX FILE] First bulk error: {error_type} - {error_reason}")
-                            except Exception as e:
-                                logger.error(f"[INDEX FILE] Bulk index error: {e}")
+                            bulk_pipeline.submit(bulk_data)  # Sent in the background while parsing continues
                             bulk_data = []
                             
                             # Update progress
@@ -1137,23 +1171,10 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
                         logger.warning(f"[INDEX FILE] Skipping invalid JSON line {line_num}: {e}")
                         continue
         
-        # Index remaining events
+        # Index remaining events, then wait for every batch to finish
         if bulk_data:
-            try:
-                success, errors = opensearch_bulk(opensearch_client, bulk_data, raise_on_error=False)
-                indexed_count += success
-                if errors:
-                    logger.warning(f"[INDEX FILE] {len(errors)} events failed to index in final batch")
-                    # Log first error for debugging (v1.13.4)
-                    if len(errors) > 0:
-                        first_error = errors[0]
-                        if isinstance(first_error, dict):
-                            error_detail = first_error.get('index', {}).get('error', {})
-                            error_type = error_detail.get('type', 'unknown')
-                            error_reason = error_detail.get('reason', 'unknown')
-                            logger.error(f"[INDEX FILE] First bulk error: {error_type} - {error_reason}")
-            except Exception as e:
-                logger.error(f"[INDEX FILE] Final bulk index error: {e}")
+            bulk_pipeline.submit(bulk_data, final=True)
+        indexed_count = bulk_pipeline.close()
         
         logger.info(f"[INDEX FILE] ✓ Parsed {event_count:,} events, successfully indexed {indexed_count:,} to {index_name}")
         
@@ -1248,6 +1269,10 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
         traceback_str = traceback.format_exc()
         logger.error(traceback_str)
         
+        # Let the in-flight bulk batch finish before the file is marked failed
+        if bulk_pipeline is not None:
+            bulk_pipeline.close()
+        
         case_file.indexing_status = 'Failed'
         case_file.error_message = f'{error_msg[:200]}. Check worker logs for full stack trace.'
         commit_with_retry(db.session, logger_instance=logger)
@@ -1259,12 +1284,31 @@ def index_file(db, opensearch_client, CaseFile, Case, case_id: int, filename: st
             'event_count': 0,
             'index_name': index_name
         }
+    
+    finally:
+        # Never leave the sender thread behind in the long-lived worker (no-op if already closed)
+        if bulk_pipeline is not None:
+            bulk_pipeline.close()
 
 
 # ============================================================================
 # FUNCTION 3: CHAINSAW FILE
 # ============================================================================
 
+# SigmaHQ / lolrmm rule repos are pulled at most this often (seconds) - not on
+# every file. The stamp's mtime records the last update, shared by all workers.
+RULES_UPDATE_INTERVAL = 6 * 3600
+RULES_UPDATE_STAMP = Path("/opt/casescope/staging/.rules-updated")
+
+
+def _rules_update_due() -> bool:
+    """True when the rule repos were last updated more than RULES_UPDATE_INTERVAL ago"""
+    try:
+        return time.time() - RULES_UPDATE_STAMP.stat().st_mtime >= RULES_UPDATE_INTERVAL
+    except OSError:
+        return True
+
+
 def chainsaw_file(db, opensearch_client, CaseFile, SigmaRule, SigmaViolation,
                  file_id: int, index_name: str, celery_task=None) -> dict:
     """
@@ -1353,9 +1397,12 @@ def chainsaw_file(db, opensearch_client, CaseFile, SigmaRule, SigmaViolation,
         return {'status': 'error', 'message': 'Chainsaw mapping file not found', 'violations': 0}
     
     try:
+        # Pull rule repos at most every RULES_UPDATE_INTERVAL, not once per file
+        rules_update_due = _rules_update_due()
+        
         # Update SigmaHQ rules (already present at /opt/casescope/sigma_rules_repo)
         logger.info("[CHAINSAW FILE] Using existing SigmaHQ rules...")
-        if (sigma_dir / ".git").exists():
+        if rules_update_due and (sigma_dir / ".git").exists():
             logger.info("[CHAINSAW FILE] Updating SigmaHQ rules...")
             subprocess.run(["/usr/bin/git", "-C", str(sigma_dir), "pull", "--quiet"], 
                          check=False, capture_output=True, timeout=60)
@@ -1363,15 +1410,23 @@ def chainsaw_file(db, opensearch_client, CaseFile, SigmaRule, SigmaViolation,
         # Clone/update lolrmm rules
         logger.info("[CHAINSAW FILE] Ensuring lolrmm rules are present...")
         if (lolrmm_dir / ".git").exists():
-            logger.info("[CHAINSAW FILE] Updating lolrmm rules...")
-            subprocess.run(["/usr/bin/git", "-C", str(lolrmm_dir), "pull", "--quiet"],
-                         check=False, capture_output=True, timeout=60)
+            if rules_update_due:
+                logger.info("[CHAINSAW FILE] Updating lolrmm rules...")
+                subprocess.run(["/usr/bin/git", "-C", str(lolrmm_dir), "pull", "--quiet"],
+                             check=False, capture_output=True, timeout=60)
         elif not lolrmm_dir.exists():
             logger.info("[CHAINSAW FILE] Cloning lolrmm rules...")
             subprocess.run(["/usr/bin/git", "clone", "--quiet", "--depth", "1",
                           "https://github.com/magicsword-io/lolrmm.git", str(lolrmm_dir)],
                          check=True, capture_output=True, timeout=300)
         
+        if rules_update_due:
+            try:
+                RULES_UPDATE_STAMP.parent.mkdir(parents=True, exist_ok=True)
+                RULES_UPDATE_STAMP.touch()
+            except OSError as e:
+                logger.warning(f"[CHAINSAW FILE] Could not record rules update time: {e}")
+        
         # Validate rule directories exist
         if not sigma_rules.exists():
             logger.error(f"[CHAINSAW FILE] SigmaHQ Windows rules not found at: {sigma_rules}")
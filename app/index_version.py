@@ -13,10 +13,11 @@ from typing import Dict, Tuple, Optional
 logger = logging.getLogger('index_version')
 
 # Current index schema version - increment when EventData/UserData structure changes
-CURRENT_INDEX_VERSION = "1.19.8"
+CURRENT_INDEX_VERSION = "1.21.1"
 
 # Version history with breaking changes
 VERSION_HISTORY = {
+    "1.21.1": "Dedup document IDs changed (event_deduplication.DEDUP_ID_SCHEME 'd2') - re-index so new uploads deduplicate against existing events",
     "1.19.8": "EventData/UserData normalized + forensic fields extracted",
     "1.19.3": "Forensic field extraction added",
     "1.13.9": "EventData/UserData converted to JSON strings",
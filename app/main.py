@@ -1683,39 +1683,30 @@ def evtx_descriptions():
 @app.route('/evtx_descriptions/update', methods=['POST'])
 @login_required
 def evtx_descriptions_update():
-    """Update EVTX descriptions from all sources"""
-    from models import EventDescription
-    from evtx_descriptions import update_all_descriptions
+    """Queue an update of EVTX descriptions from all sources"""
+    from tasks import update_evtx_descriptions
+    from celery_health import check_workers_available
+    from audit_logger import log_action
     
     # Admin check
     if current_user.role != 'administrator':
         flash('Only administrators can update EVTX descriptions', 'error')
         return redirect(url_for('evtx_descriptions'))
     
-    try:
-        stats = update_all_descriptions(db, EventDescription)
-        
-        # Audit log success
-        from audit_logger import log_action
-        log_action('update_evtx_definitions', resource_type='evtx', 
-                  resource_name='EVTX Event Descriptions',
-                  details={'stats': stats})
-        
-        flash(f"Successfully updated EVTX descriptions: {stats['total_processed']} processed, "
-              f"{stats['new_events']} new, {stats['updated_events']} updated", 'success')
-        
-        for source, count in stats['sources'].items():
-            flash(f"{source}: {count} events", 'info')
-            
-    except Exception as e:
-        # Audit log failure
-        from audit_logger import log_action
-        log_action('update_evtx_definitions', resource_type='evtx',
-                  resource_name='EVTX Event Descriptions',
-                  details={'error': str(e)}, status='failed')
-        
-        flash(f'Error updating descriptions: {str(e)}', 'error')
-        logger.error(f"[EVTX UPDATE] Error: {e}", exc_info=True)
+    # Scraping every source takes a while; run it on a worker instead of
+    # holding this request open
+    workers_ok, worker_count, error_msg = check_workers_available(min_workers=1)
+    if not workers_ok:
+        flash(f'⚠️ Cannot update EVTX descriptions: {error_msg}. Please check Celery workers.', 'error')
+        return redirect(url_for('evtx_descriptions'))
+    
+    task = update_evtx_descriptions.delay()
+    
+    log_action('update_evtx_definitions', resource_type='evtx',
+              resource_name='EVTX Event Descriptions',
+              details={'task_id': task.id, 'status': 'queued'})
+    
+    flash('✅ EVTX description update queued - refresh this page in a few minutes to see the new descriptions', 'success')
     
     return redirect(url_for('evtx_descriptions'))
 
@@ -2227,8 +2218,8 @@ def export_search_results(case_id):
     """Export current search results as CSV (unlimited results via Scroll API)"""
     from models import TimelineTag
     from search_utils import build_search_query, execute_search_scroll, extract_event_fields
-    from export_utils import generate_events_csv
-    from flask import make_response
+    from export_utils import stream_events_csv
+    from flask import Response, stream_with_context
     
     case = db.session.get(Case, case_id)
     if not case:
@@ -2324,24 +2315,23 @@ def export_search_results(case_id):
         return redirect(url_for('search_events', case_id=case_id))
     
     # Pass FULL _source data to CSV (not just extracted fields)
-    # This ensures EventData (TargetUserName, ShareName, etc.) is included
-    full_events = []
-    for result in results:
-        event_data = result['_source'].copy()
-        # Add metadata
-        event_data['_id'] = result.get('_id')
-        event_data['_index'] = result.get('_index')
-        full_events.append(event_data)
-    
-    # Generate CSV with full event data
-    csv_content = generate_events_csv(full_events)
-    
-    # Create response with CSV
-    response = make_response(csv_content)
-    response.headers['Content-Type'] = 'text/csv'
-    response.headers['Content-Disposition'] = f'attachment; filename=case_{case_id}_events_export_{datetime.utcnow().strftime("%Y%m%d_%H%M%S")}.csv'
-    
-    return response
+    # This ensures EventData (TargetUserName, ShareName, etc.) is included.
+    # Each hit is read exactly once here, so _source is extended in place
+    # rather than copied per event
+    def full_events():
+        for result in results:
+            event_data = result['_source']
+            # Add metadata
+            event_data['_id'] = result.get('_id')
+            event_data['_index'] = result.get('_index')
+            yield event_data
+    
+    # Stream the CSV in chunks as it is generated instead of building it in memory
+    return Response(
+        stream_with_context(stream_events_csv(full_events())),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename=case_{case_id}_events_export_{datetime.utcnow().strftime("%Y%m%d_%H%M%S")}.csv'}
+    )
 
 
 @app.route('/case/<int:case_id>/search/event/<event_id>')
@@ -2715,11 +2705,9 @@ def sync_timeline_to_iris_case(case_id):
         return jsonify({'success': False, 'error': 'Case not found'}), 404
     
     try:
-        # Create DFIR-IRIS client
-        client = DFIRIrisClient(dfir_iris_url, dfir_iris_api_key)
-        
-        # Sync case (includes IOCs and timeline events)
-        result = sync_case_to_dfir_iris(db.session, opensearch_client, case_id, client)
+        # Create DFIR-IRIS client and sync case (includes IOCs and timeline events)
+        with DFIRIrisClient(dfir_iris_url, dfir_iris_api_key) as client:
+            result = sync_case_to_dfir_iris(db.session, opensearch_client, case_id, client)
         
         if result.get('success'):
             logger.info(f"[DFIR-IRIS SYNC] User {current_user.id} synced case {case_id} timeline to DFIR-IRIS")
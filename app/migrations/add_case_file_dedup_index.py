@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Add duplicate-check index to case_file table
+Run with: /opt/casescope/venv/bin/python app/migrations/add_case_file_dedup_index.py
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db
+from main import app
+from sqlalchemy import text
+
+def migrate():
+    """Add (case_id, original_filename, file_hash, is_deleted) INCLUDE (id) index to case_file table"""
+    print("=" * 80)
+    print("DATABASE MIGRATION: Add ix_case_file_dedup to case_file")
+    print("=" * 80)
+    print()
+
+    with app.app_context():
+        # Check if index already exists
+        result = db.session.execute(text("""
+            SELECT indexname
+            FROM pg_indexes
+            WHERE schemaname = 'public'
+            AND tablename = 'case_file'
+            AND indexname = 'ix_case_file_dedup';
+        """))
+
+        if result.first():
+            print("✅ ix_case_file_dedup index already exists")
+            print()
+            return
+
+        print("Creating ix_case_file_dedup index on case_file table...")
+        print()
+
+        db.session.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_case_file_dedup
+            ON case_file (case_id, original_filename, file_hash, is_deleted)
+            INCLUDE (id);
+        """))
+
+        # Commit changes
+        db.session.commit()
+
+        print("✅ ix_case_file_dedup index created successfully")
+        print()
+
+        print("=" * 80)
+        print("MIGRATION COMPLETE")
+        print("=" * 80)
+
+
+if __name__ == '__main__':
+    migrate()
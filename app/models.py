@@ -99,6 +99,13 @@ class CaseFile(db.Model):
     
     # Relationships
     case = db.relationship('Case', back_populates='files')
+    
+    # Covers the duplicate lookup (case + filename + hash among live files); id is
+    # INCLUDEd so the id-only query can be an index-only scan
+    __table_args__ = (
+        db.Index('ix_case_file_dedup', 'case_id', 'original_filename', 'file_hash', 'is_deleted',
+                 postgresql_include=['id']),
+    )
 
 
 class SigmaRule(db.Model):
@@ -8,7 +8,6 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request,
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 import os
-import hashlib
 import mimetypes
 import logging
 from datetime import datetime
@@ -27,12 +26,9 @@ def get_evidence_storage_path(case_id: int) -> str:
 
 
 def calculate_file_hash(file_path: str) -> str:
-    """Calculate SHA256 hash of a file"""
-    sha256 = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b''):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+    """Calculate SHA256 hash of a file (hashed in C, see utils.hash_file)"""
+    from utils import hash_file
+    return hash_file(file_path)
 
 
 def detect_file_type(filename: str) -> str:
@@ -424,55 +420,55 @@ def sync_evidence_to_dfir_iris(evidence_id):
     
     try:
         # Initialize DFIR-IRIS client
-        client = DFIRIrisClient(dfir_iris_url.setting_value, dfir_iris_api_key.setting_value)
-        
-        # Get or create customer and case in DFIR-IRIS
-        company_name = case.company or 'Unknown Company'
-        customer_id = client.get_or_create_customer(company_name)
-        if not customer_id:
-            return jsonify({
-                'success': False,
-                'message': '✗ Failed to get/create customer in DFIR-IRIS'
-            })
-        
-        iris_case_id = client.get_or_create_case(customer_id, case.name, case.description or '', company_name)
-        if not iris_case_id:
-            return jsonify({
-                'success': False,
-                'message': '✗ Failed to get/create case in DFIR-IRIS'
-            })
-        
-        # Upload evidence file to DFIR-IRIS
-        file_id = client.upload_evidence_file(
-            iris_case_id,
-            evidence_file.file_path,
-            evidence_file.original_filename,
-            evidence_file.description or ''
-        )
-        
-        if file_id:
-            # Update evidence file record
-            evidence_file.dfir_iris_synced = True
-            evidence_file.dfir_iris_file_id = str(file_id)
-            evidence_file.dfir_iris_sync_date = datetime.utcnow()
-            db.session.commit()
+        with DFIRIrisClient(dfir_iris_url.setting_value, dfir_iris_api_key.setting_value) as client:
             
-            # Audit log
-            log_file_action('sync_evidence_to_dfir_iris', evidence_id, evidence_file.original_filename, details={
-                'case_id': evidence_file.case_id,
-                'iris_file_id': file_id,
-                'iris_case_id': iris_case_id
-            })
+            # Get or create customer and case in DFIR-IRIS
+            company_name = case.company or 'Unknown Company'
+            customer_id = client.get_or_create_customer(company_name)
+            if not customer_id:
+                return jsonify({
+                    'success': False,
+                    'message': '✗ Failed to get/create customer in DFIR-IRIS'
+                })
             
-            return jsonify({
-                'success': True,
-                'message': f'✓ Evidence file synced to DFIR-IRIS (File ID: {file_id})'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': '✗ Failed to upload file to DFIR-IRIS'
-            })
+            iris_case_id = client.get_or_create_case(customer_id, case.name, case.description or '', company_name)
+            if not iris_case_id:
+                return jsonify({
+                    'success': False,
+                    'message': '✗ Failed to get/create case in DFIR-IRIS'
+                })
+            
+            # Upload evidence file to DFIR-IRIS
+            file_id = client.upload_evidence_file(
+                iris_case_id,
+                evidence_file.file_path,
+                evidence_file.original_filename,
+                evidence_file.description or ''
+            )
+            
+            if file_id:
+                # Update evidence file record
+                evidence_file.dfir_iris_synced = True
+                evidence_file.dfir_iris_file_id = str(file_id)
+                evidence_file.dfir_iris_sync_date = datetime.utcnow()
+                db.session.commit()
+                
+                # Audit log
+                log_file_action('sync_evidence_to_dfir_iris', evidence_id, evidence_file.original_filename, details={
+                    'case_id': evidence_file.case_id,
+                    'iris_file_id': file_id,
+                    'iris_case_id': iris_case_id
+                })
+                
+                return jsonify({
+                    'success': True,
+                    'message': f'✓ Evidence file synced to DFIR-IRIS (File ID: {file_id})'
+                })
+            else:
+                return jsonify({
+                    'success': False,
+                    'message': '✗ Failed to upload file to DFIR-IRIS'
+                })
         
     except Exception as e:
         logger.error(f"Error syncing evidence file {evidence_id} to DFIR-IRIS: {e}")
@@ -523,79 +519,79 @@ def bulk_sync_evidence_to_dfir_iris(case_id):
     
     try:
         # Initialize DFIR-IRIS client
-        client = DFIRIrisClient(dfir_iris_url.setting_value, dfir_iris_api_key.setting_value)
-        
-        # Get or create customer and case in DFIR-IRIS
-        company_name = case.company or 'Unknown Company'
-        customer_id = client.get_or_create_customer(company_name)
-        if not customer_id:
-            return jsonify({
-                'success': False,
-                'message': '✗ Failed to get/create customer in DFIR-IRIS'
+        with DFIRIrisClient(dfir_iris_url.setting_value, dfir_iris_api_key.setting_value) as client:
+            
+            # Get or create customer and case in DFIR-IRIS
+            company_name = case.company or 'Unknown Company'
+            customer_id = client.get_or_create_customer(company_name)
+            if not customer_id:
+                return jsonify({
+                    'success': False,
+                    'message': '✗ Failed to get/create customer in DFIR-IRIS'
+                })
+            
+            iris_case_id = client.get_or_create_case(customer_id, case.name, case.description or '', company_name)
+            if not iris_case_id:
+                return jsonify({
+                    'success': False,
+                    'message': '✗ Failed to get/create case in DFIR-IRIS'
+                })
+            
+            # Sync each evidence file
+            for evidence_file in evidence_files:
+                try:
+                    # Check if file exists on disk
+                    if not os.path.exists(evidence_file.file_path):
+                        logger.warning(f"Evidence file not found on disk: {evidence_file.file_path}")
+                        failed += 1
+                        errors.append(f'{evidence_file.original_filename}: File not found on disk')
+                        continue
+                    
+                    # Upload to DFIR-IRIS
+                    file_id = client.upload_evidence_file(
+                        iris_case_id,
+                        evidence_file.file_path,
+                        evidence_file.original_filename,
+                        evidence_file.description or ''
+                    )
+                    
+                    if file_id:
+                        # Update evidence file record
+                        evidence_file.dfir_iris_synced = True
+                        evidence_file.dfir_iris_file_id = str(file_id)
+                        evidence_file.dfir_iris_sync_date = datetime.utcnow()
+                        db.session.commit()
+                        synced += 1
+                    else:
+                        failed += 1
+                        errors.append(f'{evidence_file.original_filename}: Upload failed')
+                        
+                except Exception as e:
+                    logger.error(f"Error syncing evidence file {evidence_file.id}: {e}")
+                    failed += 1
+                    errors.append(f'{evidence_file.original_filename}: {str(e)}')
+                    db.session.rollback()
+            
+            # Audit log
+            log_file_action('bulk_sync_evidence_to_dfir_iris', case_id, f'{synced} evidence files', details={
+                'case_id': case_id,
+                'synced_count': synced,
+                'failed_count': failed,
+                'iris_case_id': iris_case_id
             })
-        
-        iris_case_id = client.get_or_create_case(customer_id, case.name, case.description or '', company_name)
-        if not iris_case_id:
+            
+            message = f'✓ Synced {synced} evidence file(s) to DFIR-IRIS'
+            if failed > 0:
+                message += f' ({failed} failed)'
+            
             return jsonify({
-                'success': False,
-                'message': '✗ Failed to get/create case in DFIR-IRIS'
+                'success': True,
+                'message': message,
+                'synced': synced,
+                'failed': failed,
+                'errors': errors[:10]  # Limit to first 10 errors
             })
         
-        # Sync each evidence file
-        for evidence_file in evidence_files:
-            try:
-                # Check if file exists on disk
-                if not os.path.exists(evidence_file.file_path):
-                    logger.warning(f"Evidence file not found on disk: {evidence_file.file_path}")
-                    failed += 1
-                    errors.append(f'{evidence_file.original_filename}: File not found on disk')
-                    continue
-                
-                # Upload to DFIR-IRIS
-                file_id = client.upload_evidence_file(
-                    iris_case_id,
-                    evidence_file.file_path,
-                    evidence_file.original_filename,
-                    evidence_file.description or ''
-                )
-                
-                if file_id:
-                    # Update evidence file record
-                    evidence_file.dfir_iris_synced = True
-                    evidence_file.dfir_iris_file_id = str(file_id)
-                    evidence_file.dfir_iris_sync_date = datetime.utcnow()
-                    db.session.commit()
-                    synced += 1
-                else:
-                    failed += 1
-                    errors.append(f'{evidence_file.original_filename}: Upload failed')
-                    
-            except Exception as e:
-                logger.error(f"Error syncing evidence file {evidence_file.id}: {e}")
-                failed += 1
-                errors.append(f'{evidence_file.original_filename}: {str(e)}')
-                db.session.rollback()
-        
-        # Audit log
-        log_file_action('bulk_sync_evidence_to_dfir_iris', case_id, f'{synced} evidence files', details={
-            'case_id': case_id,
-            'synced_count': synced,
-            'failed_count': failed,
-            'iris_case_id': iris_case_id
-        })
-        
-        message = f'✓ Synced {synced} evidence file(s) to DFIR-IRIS'
-        if failed > 0:
-            message += f' ({failed} failed)'
-        
-        return jsonify({
-            'success': True,
-            'message': message,
-            'synced': synced,
-            'failed': failed,
-            'errors': errors[:10]  # Limit to first 10 errors
-        })
-        
     except Exception as e:
         logger.error(f"Error in bulk evidence sync for case {case_id}: {e}")
         return jsonify({'success': False, 'message': f'✗ Error: {str(e)}'}), 500
@@ -417,70 +417,70 @@ def bulk_sync_iocs_to_iris(case_id):
     
     try:
         # Initialize DFIR-IRIS client
-        client = DFIRIrisClient(dfir_iris_url.setting_value, dfir_iris_api_key.setting_value)
-        
-        # Get or create customer and case in DFIR-IRIS
-        company_name = case.company or 'Unknown Company'
-        customer_id = client.get_or_create_customer(company_name)
-        if not customer_id:
-            return jsonify({
-                'success': False,
-                'message': '✗ Failed to get/create customer in DFIR-IRIS'
-            })
-        
-        iris_case_id = client.get_or_create_case(customer_id, case.name, case.description or '', company_name)
-        if not iris_case_id:
-            return jsonify({
-                'success': False,
-                'message': '✗ Failed to get/create case in DFIR-IRIS'
-            })
-        
-        # Sync each IOC
-        for ioc in iocs:
-            try:
-                ioc_id = client.sync_ioc(
-                    iris_case_id,
-                    ioc.ioc_value,
-                    ioc.ioc_type,
-                    ioc.description or '',
-                    ioc.threat_level or 'medium'
-                )
-                if ioc_id:
-                    synced += 1
-                else:
+        with DFIRIrisClient(dfir_iris_url.setting_value, dfir_iris_api_key.setting_value) as client:
+            
+            # Get or create customer and case in DFIR-IRIS
+            company_name = case.company or 'Unknown Company'
+            customer_id = client.get_or_create_customer(company_name)
+            if not customer_id:
+                return jsonify({
+                    'success': False,
+                    'message': '✗ Failed to get/create customer in DFIR-IRIS'
+                })
+            
+            iris_case_id = client.get_or_create_case(customer_id, case.name, case.description or '', company_name)
+            if not iris_case_id:
+                return jsonify({
+                    'success': False,
+                    'message': '✗ Failed to get/create case in DFIR-IRIS'
+                })
+            
+            # Sync each IOC
+            for ioc in iocs:
+                try:
+                    ioc_id = client.sync_ioc(
+                        iris_case_id,
+                        ioc.ioc_value,
+                        ioc.ioc_type,
+                        ioc.description or '',
+                        ioc.threat_level or 'medium'
+                    )
+                    if ioc_id:
+                        synced += 1
+                    else:
+                        failed += 1
+                        errors.append(f"Failed to sync {ioc.ioc_value}")
+                except Exception as e:
                     failed += 1
-                    errors.append(f"Failed to sync {ioc.ioc_value}")
-            except Exception as e:
-                failed += 1
-                errors.append(f"Error syncing {ioc.ioc_value}: {str(e)}")
-                logger.error(f"[IOC] Error syncing IOC {ioc.id}: {e}")
-        
-        # Audit log
-        from audit_logger import log_action
-        log_action('bulk_sync_iocs_to_iris', resource_type='case', resource_id=case_id,
-                  resource_name=case.name, details={
-                      'total_iocs': len(iocs),
-                      'synced': synced,
-                      'failed': failed
-                  })
-        
-        if failed == 0:
-            message = f'✓ Successfully synced {synced} IOC(s) to DFIR-IRIS'
-            return jsonify({
-                'success': True,
-                'message': message,
-                'synced': synced,
-                'failed': failed
-            })
-        else:
-            message = f'⚠️ Synced {synced} IOC(s), {failed} failed'
-            return jsonify({
-                'success': True,
-                'message': message,
-                'synced': synced,
-                'failed': failed,
-                'errors': errors[:5]  # Return first 5 errors
-            })
+                    errors.append(f"Error syncing {ioc.ioc_value}: {str(e)}")
+                    logger.error(f"[IOC] Error syncing IOC {ioc.id}: {e}")
+            
+            # Audit log
+            from audit_logger import log_action
+            log_action('bulk_sync_iocs_to_iris', resource_type='case', resource_id=case_id,
+                      resource_name=case.name, details={
+                          'total_iocs': len(iocs),
+                          'synced': synced,
+                          'failed': failed
+                      })
+            
+            if failed == 0:
+                message = f'✓ Successfully synced {synced} IOC(s) to DFIR-IRIS'
+                return jsonify({
+                    'success': True,
+                    'message': message,
+                    'synced': synced,
+                    'failed': failed
+                })
+            else:
+                message = f'⚠️ Synced {synced} IOC(s), {failed} failed'
+                return jsonify({
+                    'success': True,
+                    'message': message,
+                    'synced': synced,
+                    'failed': failed,
+                    'errors': errors[:5]  # Return first 5 errors
+                })
     
     except Exception as e:
         logger.error(f"[IOC] Bulk sync failed: {e}")
@@ -683,73 +683,73 @@ def sync_to_dfir_iris(ioc):
             return False
         
         # Initialize DFIR-IRIS client
-        client = DFIRIrisClient(
+        with DFIRIrisClient(
             url=dfir_iris_url.setting_value,
             api_key=dfir_iris_token.setting_value
-        )
-        
-        # Get the case this IOC belongs to
-        case = Case.query.get(ioc.case_id)
-        if not case:
-            logger.error(f"[DFIR-IRIS] Case {ioc.case_id} not found")
-            return False
-        
-        # Get or create customer (company) in DFIR-IRIS
-        company_name = case.company or 'Unknown Company'
-        customer_id = client.get_or_create_customer(company_name)
-        if not customer_id:
-            logger.error(f"[DFIR-IRIS] Failed to get/create customer: {company_name}")
-            return False
-        
-        # Get or create case in DFIR-IRIS
-        iris_case_id = client.get_or_create_case(
-            customer_id=customer_id,
-            case_name=case.name,
-            case_description=case.description or '',
-            company_name=company_name
-        )
-        if not iris_case_id:
-            logger.error(f"[DFIR-IRIS] Failed to get/create case: {case.name}")
-            return False
-        
-        # Build IOC description
-        description_parts = []
-        if ioc.description:
-            description_parts.append(ioc.description)
-        if ioc.source:
-            description_parts.append(f"Source: {ioc.source}")
-        description = ' | '.join(description_parts) if description_parts else f'IOC from CaseScope case {case.name}'
-        
-        # Determine threat level based on IOC criticality or tags
-        threat_level = 'medium'  # Default
-        if ioc.tags:
-            tags_lower = ioc.tags.lower()
-            if any(word in tags_lower for word in ['critical', 'high', 'severe']):
-                threat_level = 'high'
-            elif any(word in tags_lower for word in ['low', 'info']):
-                threat_level = 'low'
-        
-        # Sync IOC to DFIR-IRIS
-        iris_ioc_id = client.sync_ioc(
-            case_id=iris_case_id,
-            ioc_value=ioc.ioc_value,
-            ioc_type=ioc.ioc_type,
-            description=description,
-            threat_level=threat_level
-        )
-        
-        if not iris_ioc_id:
-            logger.error(f"[DFIR-IRIS] Failed to sync IOC: {ioc.ioc_value}")
-            return False
-        
-        # Update sync status in CaseScope
-        ioc.dfir_iris_synced = True
-        ioc.dfir_iris_sync_date = datetime.utcnow()
-        ioc.dfir_iris_ioc_id = str(iris_ioc_id)
-        db.session.commit()
-        
-        logger.info(f"[DFIR-IRIS] ✅ IOC synced successfully: {ioc.ioc_value} (IRIS ID: {iris_ioc_id})")
-        return True
+        ) as client:
+            
+            # Get the case this IOC belongs to
+            case = Case.query.get(ioc.case_id)
+            if not case:
+                logger.error(f"[DFIR-IRIS] Case {ioc.case_id} not found")
+                return False
+            
+            # Get or create customer (company) in DFIR-IRIS
+            company_name = case.company or 'Unknown Company'
+            customer_id = client.get_or_create_customer(company_name)
+            if not customer_id:
+                logger.error(f"[DFIR-IRIS] Failed to get/create customer: {company_name}")
+                return False
+            
+            # Get or create case in DFIR-IRIS
+            iris_case_id = client.get_or_create_case(
+                customer_id=customer_id,
+                case_name=case.name,
+                case_description=case.description or '',
+                company_name=company_name
+            )
+            if not iris_case_id:
+                logger.error(f"[DFIR-IRIS] Failed to get/create case: {case.name}")
+                return False
+            
+            # Build IOC description
+            description_parts = []
+            if ioc.description:
+                description_parts.append(ioc.description)
+            if ioc.source:
+                description_parts.append(f"Source: {ioc.source}")
+            description = ' | '.join(description_parts) if description_parts else f'IOC from CaseScope case {case.name}'
+            
+            # Determine threat level based on IOC criticality or tags
+            threat_level = 'medium'  # Default
+            if ioc.tags:
+                tags_lower = ioc.tags.lower()
+                if any(word in tags_lower for word in ['critical', 'high', 'severe']):
+                    threat_level = 'high'
+                elif any(word in tags_lower for word in ['low', 'info']):
+                    threat_level = 'low'
+            
+            # Sync IOC to DFIR-IRIS
+            iris_ioc_id = client.sync_ioc(
+                case_id=iris_case_id,
+                ioc_value=ioc.ioc_value,
+                ioc_type=ioc.ioc_type,
+                description=description,
+                threat_level=threat_level
+            )
+            
+            if not iris_ioc_id:
+                logger.error(f"[DFIR-IRIS] Failed to sync IOC: {ioc.ioc_value}")
+                return False
+            
+            # Update sync status in CaseScope
+            ioc.dfir_iris_synced = True
+            ioc.dfir_iris_sync_date = datetime.utcnow()
+            ioc.dfir_iris_ioc_id = str(iris_ioc_id)
+            db.session.commit()
+            
+            logger.info(f"[DFIR-IRIS] ✅ IOC synced successfully: {ioc.ioc_value} (IRIS ID: {iris_ioc_id})")
+            return True
         
     except Exception as e:
         logger.error(f"[DFIR-IRIS] ❌ Failed to sync IOC {ioc.ioc_value}: {e}", exc_info=True)
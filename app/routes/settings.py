@@ -279,28 +279,28 @@ def test_iris():
         return jsonify({'success': False, 'message': 'URL and API key are required'})
     
     try:
-        client = DFIRIrisClient(url, api_key)
-        # Try to list cases as connection test (requires cid parameter)
-        result = client._request('GET', '/manage/cases/list?cid=1')
-        
-        if result is not None:
-            # If we get any response (even empty data), connection works
-            if isinstance(result, dict) and 'data' in result:
-                case_count = len(result['data']) if isinstance(result['data'], list) else 0
-                return jsonify({
-                    'success': True,
-                    'message': f'✓ Connection successful! Found {case_count} case(s)'
-                })
+        with DFIRIrisClient(url, api_key) as client:
+            # Try to list cases as connection test (requires cid parameter)
+            result = client._request('GET', '/manage/cases/list?cid=1')
+            
+            if result is not None:
+                # If we get any response (even empty data), connection works
+                if isinstance(result, dict) and 'data' in result:
+                    case_count = len(result['data']) if isinstance(result['data'], list) else 0
+                    return jsonify({
+                        'success': True,
+                        'message': f'✓ Connection successful! Found {case_count} case(s)'
+                    })
+                else:
+                    return jsonify({
+                        'success': True,
+                        'message': '✓ Connection successful! API authenticated'
+                    })
             else:
                 return jsonify({
-                    'success': True,
-                    'message': '✓ Connection successful! API authenticated'
+                    'success': False,
+                    'message': '✗ Connection failed - No response from server'
                 })
-        else:
-            return jsonify({
-                'success': False,
-                'message': '✗ Connection failed - No response from server'
-            })
     except Exception as e:
         return jsonify({
             'success': False,
@@ -338,136 +338,136 @@ def sync_now():
         })
     
     try:
-        client = DFIRIrisClient(dfir_iris_url, dfir_iris_api_key)
-        
-        # Get all cases
-        # v1.16.0+: Get all cases regardless of status
-        active_cases = db.session.query(Case).all()
-        
-        if not active_cases:
-            return jsonify({
-                'success': True,
-                'message': '✓ No active cases to sync'
-            })
-        
-        cases_synced = 0
-        cases_failed = 0
-        systems_synced = 0
-        systems_failed = 0
-        
-        # Sync cases (which includes IOCs and timeline events)
-        for case in active_cases:
-            try:
-                result = sync_case_to_dfir_iris(db.session, opensearch_client, case.id, client)
-                if result.get('success'):
-                    cases_synced += 1
-                    logger.info(f"Synced case: {case.name} (ID: {case.id})")
-                else:
+        with DFIRIrisClient(dfir_iris_url, dfir_iris_api_key) as client:
+            
+            # Get all cases
+            # v1.16.0+: Get all cases regardless of status
+            active_cases = db.session.query(Case).all()
+            
+            if not active_cases:
+                return jsonify({
+                    'success': True,
+                    'message': '✓ No active cases to sync'
+                })
+            
+            cases_synced = 0
+            cases_failed = 0
+            systems_synced = 0
+            systems_failed = 0
+            
+            # Sync cases (which includes IOCs and timeline events)
+            for case in active_cases:
+                try:
+                    result = sync_case_to_dfir_iris(db.session, opensearch_client, case.id, client)
+                    if result.get('success'):
+                        cases_synced += 1
+                        logger.info(f"Synced case: {case.name} (ID: {case.id})")
+                    else:
+                        cases_failed += 1
+                        logger.error(f"Failed to sync case: {case.name} (ID: {case.id})")
+                except Exception as e:
                     cases_failed += 1
-                    logger.error(f"Failed to sync case: {case.name} (ID: {case.id})")
-            except Exception as e:
-                cases_failed += 1
-                logger.error(f"Error syncing case {case.name} (ID: {case.id}): {e}")
-        
-        # Sync all systems as assets
-        from routes.systems import sync_to_dfir_iris
-        all_systems = db.session.query(System).all()
-        
-        for system in all_systems:
-            try:
-                result = sync_to_dfir_iris(system)
-                if result:
-                    systems_synced += 1
-                else:
+                    logger.error(f"Error syncing case {case.name} (ID: {case.id}): {e}")
+            
+            # Sync all systems as assets
+            from routes.systems import sync_to_dfir_iris
+            all_systems = db.session.query(System).all()
+            
+            for system in all_systems:
+                try:
+                    result = sync_to_dfir_iris(system)
+                    if result:
+                        systems_synced += 1
+                    else:
+                        systems_failed += 1
+                except Exception as e:
                     systems_failed += 1
-            except Exception as e:
-                systems_failed += 1
-                logger.error(f"Error syncing system {system.system_name} (ID: {system.id}): {e}")
-        
-        # Sync all evidence files
-        from models import EvidenceFile
-        from datetime import datetime
-        evidence_synced = 0
-        evidence_failed = 0
-        
-        # Get all evidence files across all cases
-        all_evidence = db.session.query(EvidenceFile).all()
-        
-        for evidence_file in all_evidence:
-            try:
-                # Get case for this evidence file
-                case = db.session.get(Case, evidence_file.case_id)
-                if not case:
-                    continue
-                
-                # Get or create customer and case in DFIR-IRIS
-                company_name = case.company or 'Unknown Company'
-                customer_id = client.get_or_create_customer(company_name)
-                if not customer_id:
-                    evidence_failed += 1
-                    continue
-                
-                iris_case_id = client.get_or_create_case(customer_id, case.name, case.description or '', company_name)
-                if not iris_case_id:
-                    evidence_failed += 1
-                    continue
-                
-                # Check if file exists on disk
-                import os
-                if not os.path.exists(evidence_file.file_path):
-                    evidence_failed += 1
-                    logger.warning(f"Evidence file not found: {evidence_file.file_path}")
-                    continue
-                
-                # Upload to DFIR-IRIS
-                file_id = client.upload_evidence_file(
-                    iris_case_id,
-                    evidence_file.file_path,
-                    evidence_file.original_filename,
-                    evidence_file.description or ''
-                )
-                
-                if file_id:
-                    # Update evidence file record
-                    evidence_file.dfir_iris_synced = True
-                    evidence_file.dfir_iris_file_id = str(file_id)
-                    evidence_file.dfir_iris_sync_date = datetime.utcnow()
-                    db.session.commit()
-                    evidence_synced += 1
-                else:
+                    logger.error(f"Error syncing system {system.system_name} (ID: {system.id}): {e}")
+            
+            # Sync all evidence files
+            from models import EvidenceFile
+            from datetime import datetime
+            evidence_synced = 0
+            evidence_failed = 0
+            
+            # Get all evidence files across all cases
+            all_evidence = db.session.query(EvidenceFile).all()
+            
+            for evidence_file in all_evidence:
+                try:
+                    # Get case for this evidence file
+                    case = db.session.get(Case, evidence_file.case_id)
+                    if not case:
+                        continue
+                    
+                    # Get or create customer and case in DFIR-IRIS
+                    company_name = case.company or 'Unknown Company'
+                    customer_id = client.get_or_create_customer(company_name)
+                    if not customer_id:
+                        evidence_failed += 1
+                        continue
+                    
+                    iris_case_id = client.get_or_create_case(customer_id, case.name, case.description or '', company_name)
+                    if not iris_case_id:
+                        evidence_failed += 1
+                        continue
+                    
+                    # Check if file exists on disk
+                    import os
+                    if not os.path.exists(evidence_file.file_path):
+                        evidence_failed += 1
+                        logger.warning(f"Evidence file not found: {evidence_file.file_path}")
+                        continue
+                    
+                    # Upload to DFIR-IRIS
+                    file_id = client.upload_evidence_file(
+                        iris_case_id,
+                        evidence_file.file_path,
+                        evidence_file.original_filename,
+                        evidence_file.description or ''
+                    )
+                    
+                    if file_id:
+                        # Update evidence file record
+                        evidence_file.dfir_iris_synced = True
+                        evidence_file.dfir_iris_file_id = str(file_id)
+                        evidence_file.dfir_iris_sync_date = datetime.utcnow()
+                        db.session.commit()
+                        evidence_synced += 1
+                    else:
+                        evidence_failed += 1
+                except Exception as e:
                     evidence_failed += 1
-            except Exception as e:
-                evidence_failed += 1
-                logger.error(f"Error syncing evidence file {evidence_file.id}: {e}")
-                db.session.rollback()
-        
-        # Build response message
-        messages = []
-        if cases_synced > 0:
-            messages.append(f'{cases_synced} case(s)')
-        if systems_synced > 0:
-            messages.append(f'{systems_synced} system(s)')
-        if evidence_synced > 0:
-            messages.append(f'{evidence_synced} evidence file(s)')
-        
-        if cases_failed == 0 and systems_failed == 0 and evidence_failed == 0:
-            return jsonify({
-                'success': True,
-                'message': f'✓ Successfully synced {", ".join(messages)} to DFIR-IRIS'
-            })
-        else:
-            fail_messages = []
-            if cases_failed > 0:
-                fail_messages.append(f'{cases_failed} case(s) failed')
-            if systems_failed > 0:
-                fail_messages.append(f'{systems_failed} system(s) failed')
-            if evidence_failed > 0:
-                fail_messages.append(f'{evidence_failed} evidence file(s) failed')
+                    logger.error(f"Error syncing evidence file {evidence_file.id}: {e}")
+                    db.session.rollback()
             
-            return jsonify({
-                'success': True if cases_synced > 0 or systems_synced > 0 or evidence_synced > 0 else False,
-                'message': f'⚠️ Synced {", ".join(messages)}. Failed: {", ".join(fail_messages)}. Check logs for details.'
-            })
+            # Build response message
+            messages = []
+            if cases_synced > 0:
+                messages.append(f'{cases_synced} case(s)')
+            if systems_synced > 0:
+                messages.append(f'{systems_synced} system(s)')
+            if evidence_synced > 0:
+                messages.append(f'{evidence_synced} evidence file(s)')
+            
+            if cases_failed == 0 and systems_failed == 0 and evidence_failed == 0:
+                return jsonify({
+                    'success': True,
+                    'message': f'✓ Successfully synced {", ".join(messages)} to DFIR-IRIS'
+                })
+            else:
+                fail_messages = []
+                if cases_failed > 0:
+                    fail_messages.append(f'{cases_failed} case(s) failed')
+                if systems_failed > 0:
+                    fail_messages.append(f'{systems_failed} system(s) failed')
+                if evidence_failed > 0:
+                    fail_messages.append(f'{evidence_failed} evidence file(s) failed')
+                
+                return jsonify({
+                    'success': True if cases_synced > 0 or systems_synced > 0 or evidence_synced > 0 else False,
+                    'message': f'⚠️ Synced {", ".join(messages)}. Failed: {", ".join(fail_messages)}. Check logs for details.'
+                })
     
     except Exception as e:
         logger.error(f"Sync failed: {e}")
@@ -206,10 +206,13 @@ def process_file(self, file_id, operation='full'):
                     filename=case_file.original_filename,
                     file_path=case_file.file_path,
                     upload_type=case_file.upload_type or 'http',
-                    exclude_file_id=file_id
+                    exclude_file_id=file_id,
+                    file_hash=case_file.file_hash,
+                    commit=False
                 )
                 
                 if dup_result['status'] == 'skip':
+                    # SkippedFile row and status land in one transaction
                     case_file.indexing_status = 'Completed'
                     commit_with_retry(db.session, logger_instance=logger)
                     return {'status': 'success', 'message': 'Skipped (duplicate)'}
@@ -678,6 +681,42 @@ def refresh_descriptions_global(self):
         return result
 
 
+@celery_app.task(bind=True, name='tasks.update_evtx_descriptions')
+def update_evtx_descriptions(self):
+    """Scrape all EVTX description sources into the EventDescription table"""
+    from main import app, db
+    from models import EventDescription
+    from evtx_descriptions import update_all_descriptions
+    
+    from audit_logger import log_action
+    
+    with app.app_context():
+        logger.info("[EVTX UPDATE] Starting description update from all sources")
+        
+        try:
+            stats = update_all_descriptions(db, EventDescription)
+        except Exception as e:
+            logger.error(f"[EVTX UPDATE] ✗ Error: {e}", exc_info=True)
+            # Audit log failure (task_id matches the 'queued' entry written by the route)
+            db.session.rollback()
+            log_action('update_evtx_definitions', resource_type='evtx',
+                      resource_name='EVTX Event Descriptions',
+                      details={'task_id': self.request.id, 'error': str(e)}, status='failed')
+            raise
+        
+        # Audit log success
+        log_action('update_evtx_definitions', resource_type='evtx',
+                  resource_name='EVTX Event Descriptions',
+                  details={'task_id': self.request.id, 'stats': stats})
+        
+        logger.info(f"[EVTX UPDATE] ✓ {stats['total_processed']} processed, "
+                    f"{stats['new_events']} new, {stats['updated_events']} updated")
+        for source, count in stats['sources'].items():
+            logger.info(f"[EVTX UPDATE]   {source}: {count} events")
+        
+        return stats
+
+
 @celery_app.task(bind=True, name='tasks.single_file_rehunt')
 def single_file_rehunt(self, file_id):
     """Re-hunt IOCs on a single file (clears old matches first)"""
@@ -11,7 +11,6 @@ import sys
 import shutil
 import zipfile
 import json
-import hashlib
 import subprocess
 import tempfile
 import logging
@@ -521,12 +520,9 @@ def extract_zips_in_staging(case_id: int) -> Dict:
 # ============================================================================
 
 def hash_file_fast(file_path: str) -> str:
-    """Fast SHA256 hash using chunked reading"""
-    sha256 = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        while chunk := f.read(8192):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+    """Fast SHA256 hash (hashed in C, see utils.hash_file)"""
+    from utils import hash_file
+    return hash_file(file_path)
 
 
 def build_file_queue(db, CaseFile, SkippedFile, case_id: int) -> Dict:
@@ -598,7 +594,7 @@ def build_file_queue(db, CaseFile, SkippedFile, case_id: int) -> Dict:
         file_hash = hash_file_fast(staging_path)
         
         # Check if (hash + filename) exists in CaseFile
-        existing_case_file = db.session.query(CaseFile).filter_by(
+        existing_case_file = db.session.query(CaseFile.id).filter_by(
             case_id=case_id,
             original_filename=filename,
             file_hash=file_hash
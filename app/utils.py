@@ -3,7 +3,9 @@
 CaseScope 2026 v1.0.0 - Utility Functions
 """
 
+import os
 import re
+import mmap
 import hashlib
 
 
@@ -58,22 +60,57 @@ def make_index_name(case_id, filename=None):
     return f"case_{case_id}"
 
 
-def hash_file(file_path, algorithm='sha256'):
+# Read size for the fallback hashing loop (files that cannot be memory-mapped)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file_with_size(file_path, algorithm='sha256'):
     """
-    Calculate file hash
+    Calculate file hash and size with a single open + fstat
+    
+    The file is memory-mapped and handed to hashlib in one update() call, so
+    hashing runs in C without copying each chunk into a bytes object.
     
     Args:
         file_path: Path to file
         algorithm: Hash algorithm (default: sha256)
     
     Returns:
-        str: Hex digest of file hash
+        tuple: (hex digest, file size in bytes)
     """
     hasher = hashlib.new(algorithm)
     
     with open(file_path, 'rb') as f:
-        while chunk := f.read(8192):
-            hasher.update(chunk)
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size:
+            # Hint the kernel to read ahead aggressively for this one-pass read
+            if hasattr(os, 'posix_fadvise'):
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                except OSError:
+                    pass
+            
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    hasher.update(mm)
+            except (OSError, ValueError):
+                # Not mappable (special file, exotic filesystem) - plain reads
+                while chunk := f.read(HASH_CHUNK_SIZE):
+                    hasher.update(chunk)
     
-    return hasher.hexdigest()
+    return hasher.hexdigest(), file_size
+
+
+def hash_file(file_path, algorithm='sha256'):
+    """
+    Calculate file hash
+    
+    Args:
+        file_path: Path to file
+        algorithm: Hash algorithm (default: sha256)
+    
+    Returns:
+        str: Hex digest of file hash
+    """
+    return hash_file_with_size(file_path, algorithm)[0]
 